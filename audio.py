@@ -0,0 +1,35 @@
+"""Buzzer tones and sound effects"""
+
+import hal
+
+buzzer = hal.get().buzzer
+
+def beep(freq=2000, duration=0.08):
+    buzzer.frequency = freq
+    buzzer.duty_cycle = 32768
+    hal.clock.sleep(duration)
+    buzzer.duty_cycle = 0
+
+def sfx_hit():
+    beep(2400, 0.06)
+
+def sfx_miss():
+    beep(500, 0.35)
+
+def sfx_game_over():
+    beep(400, 0.15)
+    beep(300, 0.15)
+    beep(200, 0.2)
+
+def sfx_level_up():
+    beep(1500, 0.05)
+    beep(1800, 0.05)
+    beep(2200, 0.07)
+
+def sfx_mp_hit():
+    """Multiplayer hit sound - matches single-player"""
+    beep(2400, 0.06)
+
+def sfx_mp_miss():
+    """Multiplayer miss sound - matches single-player"""
+    beep(500, 0.35)
@@ -0,0 +1,293 @@
+"""BENCHMARK menu entry: on-device performance self-test
+
+Runs a fixed sequence of measurements so every board can be checked the same
+way after a firmware change. Each result is printed on the serial console as
+
+    BENCH <key> <value>
+
+and returned as (name, value) text pairs short enough for the OLED.
+
+Imported from the menu only when BENCHMARK is chosen; start() and frame()
+are the menu entry, run() the measurements.
+"""
+
+import gc
+import hal
+import leds
+import sensors
+import ui
+
+LOOP_FRAMES = 200
+REFRESH_FRAMES = 30
+FULL_REFRESHES = 6
+ACCEL_READS = 100
+PIXEL_WRITES = 60
+LABEL_WRITES = 100
+UART_PINGS = 10
+UART_TIMEOUT = 0.1
+
+# ADXL345 data rate codes -> output data rate in Hz
+def _adxl_odr(code):
+    return 3200 / (1 << (15 - code))
+
+class Bench:
+    def __init__(self, hw, splash, status_label, load):
+        self.hw = hw
+        self.load = load
+        self.clock = hw.clock
+        self.display = hw.display
+        self.splash = splash
+        self.status_label = status_label
+        self.results = []
+
+    def _ns(self):
+        return self.clock.monotonic_ns()
+
+    def status(self, text):
+        self.status_label.text = text
+        self.display.refresh()
+
+    def report(self, key, value, name=None, shown=None):
+        print("BENCH", key, value)
+        if name is not None:
+            self.results.append((name, shown))
+
+    def loop_rate(self, frame):
+        """Main-loop iterations per second, with and without a refresh"""
+        n = LOOP_FRAMES
+        t0 = self._ns()
+        for _ in range(n):
+            frame()
+        dt = self._ns() - t0
+        hz = n * 1e9 / dt if dt else 0
+        self.report("loop_hz", "%.0f" % hz, "loop", "%.0f/s" % hz)
+
+        n = REFRESH_FRAMES
+        refresh_ns = 0
+        t0 = self._ns()
+        for _ in range(n):
+            frame()
+            r0 = self._ns()
+            self.display.refresh()
+            refresh_ns += self._ns() - r0
+        dt = self._ns() - t0
+        hz = n * 1e9 / dt if dt else 0
+        self.report("loop_refresh_hz", "%.0f" % hz, "loop+ref", "%.0f/s" % hz)
+        ms = refresh_ns / n / 1e6
+        self.report("frame_refresh_ms", "%.2f" % ms, "refresh", "%.1fms" % ms)
+
+    def full_refresh(self):
+        """Swapping the root group makes displayio redraw the whole screen"""
+        empty = self.hw.Group()
+        total = 0
+        for i in range(FULL_REFRESHES):
+            self.display.root_group = empty if i % 2 == 0 else self.splash
+            t0 = self._ns()
+            self.display.refresh()
+            total += self._ns() - t0
+        self.display.root_group = self.splash
+        self.display.refresh()
+        ms = total / FULL_REFRESHES / 1e6
+        self.report("full_refresh_ms", "%.2f" % ms, "full ref", "%.1fms" % ms)
+
+    def accel(self):
+        acc = self.hw.accelerometer
+        t0 = self._ns()
+        for _ in range(ACCEL_READS):
+            acc.acceleration
+        us = (self._ns() - t0) / ACCEL_READS / 1000
+        rate = 1e6 / us if us else 0
+        # The sensor itself cannot produce new samples faster than its ODR
+        code = getattr(acc, "data_rate", None)
+        if isinstance(code, int):
+            rate = min(rate, _adxl_odr(code))
+        self.report("accel_read_us", "%.0f" % us, "accel", "%.2fms" % (us / 1000))
+        self.report("accel_rate_hz", "%.0f" % rate, "accel hz", "%.0f/s" % rate)
+
+    def neopixel(self):
+        pixels = self.hw.pixels
+        saved = [pixels[i] for i in range(len(pixels))]
+        colors = ((0, 0, 40), (0, 40, 0))
+        t0 = self._ns()
+        for i in range(PIXEL_WRITES):
+            pixels[i % len(pixels)] = colors[i & 1]
+        us = (self._ns() - t0) / PIXEL_WRITES / 1000
+        for i, c in enumerate(saved):
+            pixels[i] = c
+        self.report("pixel_write_us", "%.0f" % us, "pixel", "%.2fms" % (us / 1000))
+
+    def label_text(self, label):
+        saved = label.text
+        texts = ("12.3", "45.6")
+        t0 = self._ns()
+        for i in range(LABEL_WRITES):
+            label.text = texts[i & 1]
+        us = (self._ns() - t0) / LABEL_WRITES / 1000
+        label.text = saved
+        self.report("label_text_us", "%.0f" % us, "label", "%.2fms" % (us / 1000))
+
+    def uart_rtt(self, uart):
+        """PING:<n> answered by PONG:<n> (peer) or echoed (TX-RX loopback)"""
+        if uart is None:
+            self.report("uart_rtt_ms", "na", "uart", "N/A")
+            return
+        # Drop anything already waiting
+        while uart.readline():
+            pass
+        rtts = []
+        for n in range(UART_PINGS):
+            tag = "%d" % n
+            t0 = self._ns()
+            uart.write(("PING:%s\n" % tag).encode())
+            deadline = self.clock.monotonic() + UART_TIMEOUT
+            while self.clock.monotonic() < deadline:
+                line = uart.readline()
+                if not line:
+                    self.clock.sleep(0.001)
+                    continue
+                try:
+                    msg = line.decode().strip()
+                except Exception:
+                    continue
+                if msg in ("PONG:" + tag, "PING:" + tag):
+                    rtts.append(self._ns() - t0)
+                    break
+        if not rtts:
+            self.report("uart_rtt_ms", "none", "uart", "no reply")
+            return
+        ms = sum(rtts) / len(rtts) / 1e6
+        self.report("uart_rtt_ms", "%.2f" % ms, "uart", "%.1fms %d/%d" % (ms, len(rtts), UART_PINGS))
+
+    def endless_scaling(self):
+        """ENDLESS arrays vs the HARD per-dict loop at growing target counts"""
+        endless = self.load("ENDLESS")
+        if not endless.available():
+            self.report("endless_us", "na", "endless", "no ulab")
+            return
+        for n, array_us, draw_us, dict_us in endless.scaling(self.clock, self.load("HARD")):
+            # dict_us is None when 500 dict targets do not fit in RAM
+            dict_shown = "mem" if dict_us is None else "%.1f" % (dict_us / 1000)
+            self.report("endless_%d_dict_us" % n, "mem" if dict_us is None else "%d" % dict_us)
+            self.report("endless_%d_draw_us" % n, "%d" % draw_us)
+            self.report("endless_%d_array_us" % n, "%d" % array_us,
+                        "end%d" % n, "%.1f/%sms" % (array_us / 1000, dict_shown))
+
+    def nvm_commit(self):
+        """One score record written to the next NVM slot, as at a GAME OVER"""
+        import scores
+        if scores.store.nvm is None:
+            self.report("nvm_commit_us", "na", "nvm", "none")
+            return
+        us = scores.store.commit(force=True)
+        self.report("nvm_commit_us", "%d" % us, "nvm", "%.1fms" % (us / 1000))
+
+    def memory(self):
+        gc.collect()
+        free = gc.mem_free() if hasattr(gc, "mem_free") else -1
+        self.report("mem_free", "%d" % free, "free", "%dB" % free)
+
+def run(hw, splash, status_label, text_label, frame, uart, load):
+    """Run every test; returns [(name, value)] for display
+
+    frame() does the work of one game frame without sleeping; text_label is
+    used for the label update test; load(mode) returns a menu entry's module.
+    """
+    bench = Bench(hw, splash, status_label, load)
+    display = hw.display
+    auto = display.auto_refresh
+    # Background refreshes would leak into every measurement
+    display.auto_refresh = False
+    print("BENCH start")
+    try:
+        bench.status("loop...")
+        bench.loop_rate(frame)
+        bench.status("display...")
+        bench.full_refresh()
+        bench.status("accel...")
+        bench.accel()
+        bench.status("neopixel...")
+        bench.neopixel()
+        bench.status("labels...")
+        bench.label_text(text_label)
+        bench.status("uart...")
+        bench.uart_rtt(uart)
+        bench.status("endless...")
+        bench.endless_scaling()
+        bench.status("nvm...")
+        bench.nvm_commit()
+        bench.memory()
+    finally:
+        display.auto_refresh = auto
+    print("BENCH done")
+    return bench.results
+
+# Menu entry
+BENCH_LINES_PER_PAGE = 3
+
+game_state = "DONE"
+bench_results = []
+bench_page = 0
+modes = None    # HARD mode's module, from claw.load()
+
+def bench_frame():
+    """One HARD-mode frame without the sleep, for the loop rate test"""
+    raw_x = sensors.read_raw()
+    claw_x = sensors.claw_x(raw_x - sensors.offset_x)
+    modes.update_hard_balls()
+    ui.timer_label.text = f"{raw_x:4.1f}"
+    ui.set_claw_x(claw_x)
+
+def show_bench_page():
+    pages = (len(bench_results) + BENCH_LINES_PER_PAGE - 1) // BENCH_LINES_PER_PAGE
+    first = bench_page * BENCH_LINES_PER_PAGE
+    lines = []
+    for name, value in bench_results[first:first + BENCH_LINES_PER_PAGE]:
+        lines.append(f"{name:<8}{value:>12}")
+    ui.title_label.text = f"BENCH {bench_page + 1}/{pages}"
+    ui.message_label.text = "\n".join(lines)
+
+def start(mode="BENCHMARK", tap=None):
+    global game_state, bench_results, bench_page, modes
+    # Through claw.load(), so the menu's MEM load lines stay right
+    import claw
+
+    hw = hal.get()
+    modes = claw.load("HARD")
+    game_state = "RUNNING"
+    leds.clear_health_bar()
+
+    ui.title_label.text = "BENCHMARK"
+    ui.clear_hud()
+
+    # Representative load: the claw plus three moving HARD targets
+    saved_level = modes.current_level_index
+    modes.current_level_index = len(modes.LEVEL_DATA) - 1
+    modes.init_hard_balls_for_level()
+    ui.show_claw(True)
+
+    bench_results = run(hw, ui.splash, ui.message_label, ui.timer_label, bench_frame,
+                        hw.open_uart(), claw.load)
+
+    modes.clear_hard_balls()
+    modes.current_level_index = saved_level
+    ui.show_claw(False)
+    ui.timer_label.text = ""
+    game_state = "DONE"
+    bench_page = 0
+    show_bench_page()
+
+def hide():
+    pass
+
+def digest_values():
+    return []
+
+def frame(button_pressed, tap, prof):
+    """Press to page through the results; True after the last page"""
+    global bench_page
+    if button_pressed:
+        bench_page += 1
+        if bench_page * BENCH_LINES_PER_PAGE >= len(bench_results):
+            return True
+        show_bench_page()
+    return False
@@ -0,0 +1,3 @@
+import claw
+
+claw.main()
@@ -0,0 +1,293 @@
+"""ENDLESS: more and faster targets every level, until the lives run out
+
+Targets live in ulab.numpy arrays (x, velocity, row) rather than one dict and
+one Label each. A frame moves, bounces and hit tests all of them with
+whole-array operations and draws them as pixels of one Bitmap, shown by a
+single TileGrid under the claw. A drop takes every target under the claw off
+the field; clearing the field before the timer runs out starts the next
+level with ENDLESS_TARGET_STEP more targets, and faster. A miss or a timeout
+costs a life. The count stops at ENDLESS_MAX_TARGETS only because RAM does.
+
+Firmware without ulab shows "ULAB N/A" in the menu. Host tools use numpy
+when it is installed.
+
+scaling() times the move + hit test against the target count for these
+arrays and for the per-dict loop of HARD mode (modes.update_hard_balls() and
+check_hit_hard()), and the bitmap redraw on its own; the BENCHMARK menu
+entry and tools/bench.py report it.
+"""
+
+import random
+import hal
+import memman
+import governor
+import audio
+import leds
+import sensors
+import scores
+from ui import SCREEN_WIDTH, SCREEN_HEIGHT, CLAW_WIDTH, DROP_STEPS, DROP_STEP_PIXELS
+from ui import splash, set_claw_y, set_claw_x, show_claw, claw_line1
+from ui import title_label, level_label, timer_label, hits_label, message_label
+from profiler import P_ACCEL, P_BALLS, P_LABELS, P_ACTION
+
+try:
+    from ulab import numpy as np
+except ImportError:
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+
+ENDLESS_START_TARGETS = 5
+ENDLESS_TARGET_STEP = 5
+ENDLESS_MAX_TARGETS = 500
+ENDLESS_BASE_SPEED = 0.6
+ENDLESS_SPEED_STEP = 0.15
+ENDLESS_BASE_TIME = 15.0
+ENDLESS_TIME_PER_TARGET = 0.2
+
+# Targets are single pixels in a band at the bottom of the screen
+FIELD_Y = 44
+FIELD_H = SCREEN_HEIGHT - FIELD_Y
+MAX_X = SCREEN_WIDTH - 1
+
+SCALE_COUNTS = (10, 100, 500)
+SCALE_FRAMES = 30
+
+hw = hal.get()
+mem = memman.mem
+
+# Game state variables
+game_state = "PLAYING"
+current_level_index = 0
+score = 0
+lives = 3
+time_limit = 0.0
+round_start_time = 0.0
+
+xs = None       # target x positions
+vxs = None      # target velocities, pixels per frame
+rows = None     # bitmap row of each target
+pace = governor.Pace()
+
+# Target layer
+bitmap = hw.Bitmap(SCREEN_WIDTH, FIELD_H, 2)
+palette = hw.Palette(2)
+palette[0] = 0x000000
+palette[1] = 0xFFFFFF
+layer = hw.TileGrid(bitmap, pixel_shader=palette, x=0, y=FIELD_Y)
+splash.append(layer)
+layer.hidden = True
+
+def available():
+    return np is not None
+
+def target_count():
+    n = ENDLESS_START_TARGETS + ENDLESS_TARGET_STEP * current_level_index
+    return n if n < ENDLESS_MAX_TARGETS else ENDLESS_MAX_TARGETS
+
+def spawn_targets(n, speed):
+    global xs, vxs, rows
+    xs = np.array([random.uniform(0, MAX_X) for _ in range(n)])
+    vxs = np.array([speed * random.uniform(0.5, 1.5) * (1 if random.random() < 0.5 else -1)
+                    for _ in range(n)])
+    rows = np.array([random.randint(0, FIELD_H - 1) for _ in range(n)], dtype=np.uint8)
+
+def move_targets(steps=1.0):
+    """Integrate `steps` frames and bounce every target off the screen edges"""
+    global xs, vxs
+    xs += vxs * steps
+    vxs = np.where(xs < 0, -vxs, vxs)
+    vxs = np.where(xs > MAX_X, -vxs, vxs)
+    xs = np.clip(xs, 0, MAX_X)
+
+def catch_targets(claw_left):
+    """Take the targets under the claw off the field; returns how many"""
+    global xs, vxs, rows
+    keep = abs(xs - (claw_left + CLAW_WIDTH / 2)) > CLAW_WIDTH / 2
+    left = xs[keep]
+    n = len(xs) - len(left)
+    if n:
+        xs = left
+        vxs = vxs[keep]
+        rows = rows[keep]
+    return n
+
+def draw_targets():
+    bitmap.fill(0)
+    for x, y in zip(np.array(xs, dtype=np.uint8), rows):
+        bitmap[x, y] = 1
+
+def start_level():
+    global game_state, time_limit, round_start_time
+    n = target_count()
+    spawn_targets(n, ENDLESS_BASE_SPEED + ENDLESS_SPEED_STEP * current_level_index)
+    time_limit = ENDLESS_BASE_TIME + ENDLESS_TIME_PER_TARGET * n
+    round_start_time = hal.clock.monotonic()
+    game_state = "PLAYING"
+    pace.reset()
+    level_label.text = f"Lv{current_level_index + 1}"
+    timer_label.text = f"{time_limit:4.1f}"
+    hits_label.text = str(n)
+    message_label.text = ""
+    draw_targets()
+    mem.safe_point()
+
+def start(mode="ENDLESS", tap=None):
+    global current_level_index, score, lives
+    sensors.calibrate()
+    current_level_index = 0
+    score = 0
+    lives = 3
+    leds.update_health_bar(lives)
+    title_label.text = "ENDLESS"
+    layer.hidden = False
+    start_level()
+    show_claw(True)
+
+def hide():
+    layer.hidden = True
+
+def digest_values():
+    return [score, lives, current_level_index, int(np.sum(xs)) if xs is not None else 0]
+
+def lose_life():
+    global game_state, lives
+    lives -= 1
+    leds.update_health_bar(lives)
+    if lives == 0:
+        game_state = "GAME_OVER"
+        if scores.store.endless_result(score, current_level_index + 1):
+            message_label.text = f"BEST! {score}"
+        else:
+            message_label.text = f"GAME OVER {score}"
+        audio.sfx_game_over()
+        scores.store.commit()
+        mem.safe_point()
+        return False
+    return True
+
+# Drop claw animation
+def drop_claw():
+    global current_level_index, score
+
+    # A pixel per GRAB_STEP; targets move a frame's worth per DROP_STEP_PIXELS
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS + 1):
+        set_claw_y(offset)
+        move_targets(1 / DROP_STEP_PIXELS)
+        draw_targets()
+        hal.clock.sleep(governor.GRAB_STEP)
+
+    caught = catch_targets(claw_line1.x)
+    if caught:
+        audio.sfx_hit()
+        score += caught
+        hits_label.text = str(len(xs))
+        if not len(xs):
+            current_level_index += 1
+            start_level()
+            audio.sfx_level_up()
+    else:
+        audio.sfx_miss()
+        lose_life()
+
+    hal.clock.sleep(0.15)
+
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS, -1, -1):
+        set_claw_y(offset)
+        move_targets(1 / DROP_STEP_PIXELS)
+        draw_targets()
+        hal.clock.sleep(governor.GRAB_STEP)
+    pace.reset()
+
+def frame(button_pressed, tap, prof):
+    """One main-loop iteration; True when the player leaves the end screen"""
+    now = hal.clock.monotonic()
+    steps = pace.steps(now)
+    remaining = time_limit - (now - round_start_time)
+    if remaining < 0:
+        remaining = 0.0
+    timer_label.text = f"{remaining:4.1f}"
+    prof.mark(P_LABELS)
+
+    # Out of time: lose a life and replay the level
+    if game_state == "PLAYING" and remaining <= 0:
+        audio.sfx_miss()
+        if lose_life():
+            start_level()
+    prof.mark(P_ACTION)
+
+    if game_state == "PLAYING":
+        move_targets(steps)
+    prof.mark(P_BALLS)
+
+    claw_x = sensors.claw_x(sensors.read_filtered(tap, steps))
+    prof.mark(P_ACCEL)
+    set_claw_x(claw_x)
+    draw_targets()
+    prof.mark(P_LABELS)
+
+    done = False
+    if button_pressed:
+        if game_state == "PLAYING":
+            drop_claw()
+        else:
+            done = True
+    prof.mark(P_ACTION)
+    return done
+
+# Scaling benchmark
+class _Dot:
+    """Stands in for a target's Label so hundreds of dict targets fit in RAM"""
+    x = 0
+
+def scaling(clock, modes, counts=SCALE_COUNTS, frames=SCALE_FRAMES):
+    """[(n, array_us, draw_us, dict_us)]: one frame's work per target count
+
+    array_us and dict_us time the same move + hit test, with the arrays and
+    with HARD's per-dict loop (its label writes go to _Dot stubs); draw_us
+    is the array side's bitmap redraw on its own. The claw is parked off
+    screen so nothing is caught and the hit test scans every target.
+    dict_us is None when the dicts do not fit in RAM. modes is HARD's
+    module, as loaded by the menu.
+    """
+    global xs, vxs, rows
+    saved_x = claw_line1.x
+    saved_hard = modes.hard_balls
+    saved_targets = xs, vxs, rows
+    claw_line1.x = -1000
+    results = []
+    try:
+        for n in counts:
+            spawn_targets(n, ENDLESS_BASE_SPEED)
+            t0 = clock.monotonic_ns()
+            for _ in range(frames):
+                move_targets()
+                catch_targets(-1000)
+            array_us = (clock.monotonic_ns() - t0) // frames // 1000
+            t0 = clock.monotonic_ns()
+            for _ in range(frames):
+                draw_targets()
+            draw_us = (clock.monotonic_ns() - t0) // frames // 1000
+
+            dict_us = None
+            try:
+                modes.hard_balls = [{"label": _Dot(), "x": float(x), "vx": float(vx)}
+                                    for x, vx in zip(xs, vxs)]
+                t0 = clock.monotonic_ns()
+                for _ in range(frames):
+                    modes.update_hard_balls()
+                    modes.check_hit_hard()
+                dict_us = (clock.monotonic_ns() - t0) // frames // 1000
+            except MemoryError:
+                pass
+            modes.hard_balls = []
+            memman.mem.safe_point()
+            results.append((n, array_us, draw_us, dict_us))
+    finally:
+        claw_line1.x = saved_x
+        modes.hard_balls = saved_hard
+        # Do not hold the last 500 targets until ENDLESS is played
+        xs, vxs, rows = saved_targets
+        bitmap.fill(0)
+    return results
@@ -0,0 +1,160 @@
+"""Loop-rate governor: frame period and sensor / UART rates per game state
+
+The state comes from the screen and the time since the last input; see
+"Loop Rate and Power" in the README for the profiles and the GOV report.
+Pace turns a frame's real duration into game steps, so speeds do not
+depend on the period.
+"""
+
+import memman
+
+IDLE_AFTER = 30.0     # s without input before the menu / end screen goes IDLE
+AIM_HOLD = 1.0        # s after the last input that a game stays in AIM
+MOVE_PIXELS = 2       # claw movement that counts as input
+MOTION_WAKE = 1.0     # m/s^2 of tilt change that wakes IDLE
+
+# state -> (period s, sensor every, uart every)
+PROFILES = {
+    "AIM": (0.010, 1, 1),
+    "PLAY": (0.015, 1, 1),
+    "END": (0.040, 2, 4),
+    "MENU": (0.020, 1, 1),
+    "IDLE": (0.250, 1, 1),
+}
+STATES = ("AIM", "PLAY", "END", "MENU", "IDLE")
+
+# Game speeds are per FRAME_TIME and scaled by the time a frame really took
+FRAME_TIME = 0.015
+MAX_STEPS = 4.0       # a longer frame (a jingle, a collection) does not make targets jump
+GRAB_STEP = 0.010     # s per pixel of claw travel in a grab
+
+# Estimated supply current, mA
+CPU_ACTIVE_MA = 24.0      # running the loop
+CPU_WAIT_MA = 15.0        # time.sleep(), CPU idle between interrupts
+CPU_LIGHT_MA = 0.8        # alarm light sleep
+PERIPHERAL_MA = 8.0       # OLED, ADXL345, NeoPixels idle
+
+mem = memman.mem
+
+class Governor:
+    def __init__(self):
+        self.clock = None         # backend clock for the duty cycle (see start())
+        self.state = "MENU"
+        self.period, self.sensor_every, self.uart_every = PROFILES["MENU"]
+        self.frame = 0            # frames in the current state
+        self.quiet = 0.0          # loop time since the last input
+        self.claw_x = None
+        self.accel_x = None
+        self.sense = True         # sample the accelerometer this frame
+        self.uart = True          # read the UART this frame
+        self.stats = {}           # state -> [frames, awake ns, wait ns, light ns]
+        self.t0 = 0
+
+    def start(self, clock):
+        self.clock = clock
+        self.t0 = clock.monotonic_ns()
+
+    def input(self):
+        """A press, encoder step or tilt: keeps the screen from going IDLE"""
+        self.quiet = 0.0
+
+    def motion(self, accel_x):
+        """Poll for a tilt while IDLE"""
+        if self.accel_x is not None and abs(accel_x - self.accel_x) > MOTION_WAKE:
+            self.quiet = 0.0
+        self.accel_x = accel_x
+
+    def update(self, screen, claw_x):
+        """Pick this frame's profile; screen is "PLAYING", "END" or "MENU" """
+        if self.claw_x is not None and abs(claw_x - self.claw_x) >= MOVE_PIXELS:
+            self.quiet = 0.0
+        self.claw_x = claw_x
+
+        if screen == "PLAYING":
+            state = "AIM" if self.quiet < AIM_HOLD else "PLAY"
+        elif self.quiet >= IDLE_AFTER:
+            state = "IDLE"
+        else:
+            state = screen
+        if state != self.state:
+            self.state = state
+            self.frame = 0
+            self.accel_x = None
+            self.period, self.sensor_every, self.uart_every = PROFILES[state]
+
+        n = self.frame
+        self.sense = n % self.sensor_every == 0
+        self.uart = n % self.uart_every == 0
+        self.frame = n + 1
+        self.quiet += self.period
+
+    def _stat(self):
+        s = self.stats.get(self.state)
+        if s is None:
+            s = [0, 0, 0, 0]
+            self.stats[self.state] = s
+        return s
+
+    def sleep(self, clock, light_sleep=None):
+        """End-of-frame sleep for the current profile
+
+        memman hides its periodic collection in it. In IDLE, light_sleep
+        (the backend's, if it has one and no session is being recorded)
+        sleeps instead.
+        """
+        t1 = self.clock.monotonic_ns()
+        s = self._stat()
+        s[0] += 1
+        s[1] += t1 - self.t0
+        if light_sleep is not None and self.state == "IDLE":
+            light_sleep(self.period)
+            self.t0 = self.clock.monotonic_ns()
+            s[3] += self.t0 - t1
+        else:
+            mem.idle_sleep(clock, self.period)
+            self.t0 = self.clock.monotonic_ns()
+            s[2] += self.t0 - t1
+
+    def summary(self):
+        """{state: (frames, duty, light, est mA)} for the states seen"""
+        out = {}
+        for state in STATES:
+            s = self.stats.get(state)
+            if s is None:
+                continue
+            total = s[1] + s[2] + s[3]
+            if not total:
+                continue
+            duty = s[1] / total
+            light = s[3] / total
+            ma = PERIPHERAL_MA + duty * CPU_ACTIVE_MA + (s[2] / total) * CPU_WAIT_MA + light * CPU_LIGHT_MA
+            out[state] = (s[0], duty, light, ma)
+        return out
+
+    def report(self):
+        """One line per state since the last report"""
+        for state, (frames, duty, light, ma) in self.summary().items():
+            print("GOV %s frames=%d period=%dms duty=%d%% light=%d%% est=%.1fmA"
+                  % (state, frames, PROFILES[state][0] * 1000, duty * 100, light * 100, ma))
+        self.stats = {}
+
+class Pace:
+    """Frames of FRAME_TIME since the last call, to scale per-frame speeds"""
+
+    def __init__(self):
+        self.last = None
+
+    def reset(self):
+        """The next call counts one frame; after a drop or a level start"""
+        self.last = None
+
+    def steps(self, now):
+        last = self.last
+        self.last = now
+        if last is None:
+            return 1.0
+        steps = (now - last) / FRAME_TIME
+        return steps if steps < MAX_STEPS else MAX_STEPS
+
+# The game's single governor; claw.py starts it once the backend is up
+gov = Governor()
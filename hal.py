@@ -0,0 +1,44 @@
+"""Hardware abstraction layer
+
+The game only touches the hardware through the object returned by get().
+On the board that is hal_board.BoardHAL. Host tools install a simulated
+backend with use() before importing claw (see tools/sim_hal.py).
+
+A backend provides:
+    clock          monotonic(), monotonic_ns(), sleep()
+    Group, Label, FONT
+    Bitmap, Palette, TileGrid   displayio bitmap layer
+    display        .root_group, .refresh()
+    accelerometer  .acceleration -> (x, y, z)
+    rot_btn, rot_a, rot_b   .value (True = released / high)
+    pixels         NUM_LEDS indexable RGB tuples
+    buzzer         .frequency, .duty_cycle
+    open_uart()    the multiplayer UART (.readline(), .write()), opened on
+                   first use, or None if unavailable
+    console_key()  next character typed on the serial console, or None
+    nvm            microcontroller.nvm (bytearray-like), or None
+    light_sleep(s) optional: sleep up to s seconds in a low-power state,
+                   waking early on a button press or encoder turn
+
+get(mark) passes `mark` to the board backend, which calls mark(name) after
+bringing up each subsystem so its RAM use can be reported (see memman.py).
+
+Game code sleeps and reads time through the module-level `clock` rather than
+the backend's, so a recording session can route it (see claw.start_tap()).
+"""
+
+_backend = None
+clock = None
+
+def use(backend):
+    global _backend, clock
+    _backend = backend
+    clock = backend.clock
+
+def get(mark=None):
+    global _backend, clock
+    if _backend is None:
+        import hal_board
+        _backend = hal_board.BoardHAL(mark)
+        clock = _backend.clock
+    return _backend
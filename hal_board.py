@@ -0,0 +1,122 @@
+"""CircuitPython backend for hal.py (Xiao ESP32-C3 board)"""
+
+import sys
+import time
+import board
+import busio
+import displayio
+import terminalio
+import digitalio
+import neopixel
+from adafruit_display_text import label
+import i2cdisplaybus
+import adafruit_displayio_ssd1306
+import adafruit_adxl34x
+import pwmio
+import supervisor
+import microcontroller
+try:
+    import alarm
+except ImportError:
+    alarm = None
+
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 64
+
+# Pins
+ROT_BTN_PIN = board.D0
+ROT_A_PIN = board.D8
+ROT_B_PIN = board.D9
+LED_PIN = board.D1
+BUZZER_PIN = board.D3
+UART_TX_PIN = board.D6
+UART_RX_PIN = board.D7
+NUM_LEDS = 3
+
+def _input_pin(pin):
+    io = digitalio.DigitalInOut(pin)
+    io.switch_to_input(pull=digitalio.Pull.UP)
+    return io
+
+def _no_mark(name):
+    pass
+
+class BoardHAL:
+    def __init__(self, mark=None):
+        mark = mark or _no_mark
+        self.clock = time
+        self.Group = displayio.Group
+        self.Bitmap = displayio.Bitmap
+        self.Palette = displayio.Palette
+        self.TileGrid = displayio.TileGrid
+        self.Label = label.Label
+        self.FONT = terminalio.FONT
+
+        # Buzzer
+        self.buzzer = pwmio.PWMOut(BUZZER_PIN, frequency=2000, duty_cycle=0, variable_frequency=True)
+        mark("buzzer")
+
+        # Display + accelerometer share the I2C bus
+        displayio.release_displays()
+        self.i2c = busio.I2C(board.SCL, board.SDA)
+        display_bus = i2cdisplaybus.I2CDisplayBus(self.i2c, device_address=0x3C)
+        self.display = adafruit_displayio_ssd1306.SSD1306(display_bus, width=SCREEN_WIDTH, height=SCREEN_HEIGHT)
+        mark("display")
+
+        self.accelerometer = adafruit_adxl34x.ADXL345(self.i2c)
+        self.accelerometer.range = adafruit_adxl34x.Range.RANGE_2_G
+        mark("accel")
+
+        # Rotary encoder + button
+        self.rot_btn = _input_pin(ROT_BTN_PIN)
+        self.rot_a = _input_pin(ROT_A_PIN)
+        self.rot_b = _input_pin(ROT_B_PIN)
+        mark("inputs")
+
+        # NeoPixel
+        self.pixels = neopixel.NeoPixel(LED_PIN, NUM_LEDS, brightness=0.3, auto_write=True)
+        mark("pixels")
+
+        self.uart = None
+        self.uart_tried = False
+
+        # Non-volatile memory for scores.py; None on ports without it
+        self.nvm = getattr(microcontroller, "nvm", None)
+
+    def open_uart(self):
+        """UART for multiplayer (TX->D6, RX->D7), opened the first time it is needed"""
+        if not self.uart_tried:
+            self.uart_tried = True
+            try:
+                self.uart = busio.UART(tx=UART_TX_PIN, rx=UART_RX_PIN, baudrate=115200, timeout=0.01)
+                print("UART initialized for multiplayer")
+            except Exception as e:
+                print("UART not available:", e)
+        return self.uart
+
+    def light_sleep(self, seconds):
+        """Alarm light sleep until `seconds` pass or the encoder is pressed or turned"""
+        if alarm is None:
+            time.sleep(seconds)
+            return
+        wake = alarm.time.TimeAlarm(monotonic_time=time.monotonic() + seconds)
+        # Pin alarms need the pins; A wakes on leaving its current level
+        a_level = self.rot_a.value
+        self.rot_btn.deinit()
+        self.rot_a.deinit()
+        try:
+            alarm.light_sleep_until_alarms(
+                wake,
+                alarm.pin.PinAlarm(ROT_BTN_PIN, value=False, pull=True),
+                alarm.pin.PinAlarm(ROT_A_PIN, value=not a_level, pull=True))
+        except (ValueError, NotImplementedError):
+            # No pin wake on this port: the timeout alone
+            alarm.light_sleep_until_alarms(wake)
+        finally:
+            self.rot_btn = _input_pin(ROT_BTN_PIN)
+            self.rot_a = _input_pin(ROT_A_PIN)
+
+    def console_key(self):
+        if supervisor.runtime.serial_bytes_available:
+            return sys.stdin.read(1)
+        return None
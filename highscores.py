@@ -0,0 +1,57 @@
+"""SCORES: best results and play counts
+
+Shows scores.store, the index read from NVM at boot, so opening the screen
+does not touch flash. Press to page through; back to the menu after the
+last page.
+"""
+
+import leds
+import scores
+import ui
+
+LINES_PER_PAGE = 3
+
+game_state = "DONE"
+lines = []
+page = 0
+
+def score_lines(store):
+    out = []
+    for i, mode in enumerate(scores.SINGLE_MODES):
+        out.append(f"{mode:<7}Lv{store.best_level[i]:<3}{store.wins[i]:>3}W{store.plays[i]:>4}x")
+    out.append(f"ENDLESS{store.endless_best:>6} Lv{store.endless_level:<3}")
+    out.append(f"  played{store.plays[4]:>11}x")
+    won, lost, tied = store.mp
+    out.append(f"MP {won}W {lost}L {tied}T{store.plays[3]:>5}x")
+    out.append(f"  best hits{store.mp_best:>9}")
+    return out
+
+def show_page():
+    pages = (len(lines) + LINES_PER_PAGE - 1) // LINES_PER_PAGE
+    first = page * LINES_PER_PAGE
+    ui.title_label.text = f"SCORES {page + 1}/{pages}"
+    ui.message_label.text = "\n".join(lines[first:first + LINES_PER_PAGE])
+
+def start(mode="SCORES", tap=None):
+    global lines, page
+    leds.clear_health_bar()
+    ui.clear_hud()
+    lines = score_lines(scores.store)
+    page = 0
+    show_page()
+
+def hide():
+    pass
+
+def digest_values():
+    return []
+
+def frame(button_pressed, tap, prof):
+    """Press to page through the scores; True after the last page"""
+    global page
+    if button_pressed:
+        page += 1
+        if page * LINES_PER_PAGE >= len(lines):
+            return True
+        show_page()
+    return False
@@ -0,0 +1,83 @@
+"""NeoPixel health bar (single player) and score bar (multiplayer)"""
+
+import hal
+
+NUM_LEDS = 3
+
+pixels = hal.get().pixels
+
+def update_health_bar(lives):
+    for i in range(NUM_LEDS):
+        if i < lives:
+            pixels[i] = (0, 255, 0)
+        else:
+            pixels[i] = (255, 0, 0)
+
+def update_mp_health_bar(diff):
+    """Show score comparison in multiplayer; diff = shooter - dodger"""
+    if diff >= 6:
+        pixels[0] = (0, 255, 0)
+        pixels[1] = (0, 255, 0)
+        pixels[2] = (0, 255, 0)
+    elif diff >= 3:
+        pixels[0] = (0, 255, 0)
+        pixels[1] = (0, 255, 0)
+        pixels[2] = (0, 0, 0)
+    elif diff > 0:
+        pixels[0] = (0, 255, 0)
+        pixels[1] = (0, 0, 0)
+        pixels[2] = (0, 0, 0)
+    elif diff == 0:
+        pixels[0] = (255, 255, 0)
+        pixels[1] = (0, 0, 0)
+        pixels[2] = (0, 0, 0)
+    elif diff >= -3:
+        pixels[0] = (255, 0, 0)
+        pixels[1] = (0, 0, 0)
+        pixels[2] = (0, 0, 0)
+    elif diff >= -6:
+        pixels[0] = (255, 0, 0)
+        pixels[1] = (255, 0, 0)
+        pixels[2] = (0, 0, 0)
+    else:
+        pixels[0] = (255, 0, 0)
+        pixels[1] = (255, 0, 0)
+        pixels[2] = (255, 0, 0)
+
+def clear_health_bar():
+    for i in range(NUM_LEDS):
+        pixels[i] = (0, 0, 0)
+
+def flash_leds_gradient(diff):
+    """Flash LEDs with color gradient for multiplayer hit"""
+    # Gradient sequence: green -> cyan -> blue -> purple
+    gradient = [
+        (0, 255, 0),      # Green
+        (0, 255, 128),    # Green-cyan
+        (0, 255, 255),    # Cyan
+        (0, 128, 255),    # Cyan-blue
+        (0, 0, 255),      # Blue
+        (128, 0, 255),    # Blue-purple
+        (255, 0, 255),    # Purple
+    ]
+    
+    for color in gradient:
+        for i in range(NUM_LEDS):
+            pixels[i] = color
+        hal.clock.sleep(0.04)
+    
+    # Return to score display
+    update_mp_health_bar(diff)
+
+def flash_leds_red(diff):
+    """Flash LEDs red for multiplayer miss"""
+    for _ in range(3):
+        for i in range(NUM_LEDS):
+            pixels[i] = (255, 0, 0)
+        hal.clock.sleep(0.08)
+        for i in range(NUM_LEDS):
+            pixels[i] = (0, 0, 0)
+        hal.clock.sleep(0.08)
+    
+    # Return to score display
+    update_mp_health_bar(diff)
@@ -0,0 +1,169 @@
+"""Heap management: collect at safe points, track free memory per mode
+
+Collections run where a pause cannot be seen, never in the middle of a frame;
+see "Boot and Memory" in the README for the MEM report lines. On CPython
+(host tools) the collector is not touched and nothing is reported.
+"""
+
+import gc
+import time
+
+IDLE_GC_FRAMES = 60
+THRESHOLD_MARGIN = 2      # gc.threshold = allocation of IDLE_GC_FRAMES frames x 2
+THRESHOLD_MIN = 4096
+
+_mem_free = getattr(gc, "mem_free", None)
+ACTIVE = _mem_free is not None
+
+def mem_free():
+    if _mem_free is None:
+        return -1
+    return _mem_free()
+
+class MemoryManager:
+    def __init__(self):
+        self.mode = "MENU"
+        self.stats = {}          # mode -> [low, safe gcs, idle gcs, total us, max us]
+        self.frames = 0
+        self.gc_us = 0           # last collection, us
+        self.since_gc = 0        # frames since the last collection
+        self.free_after = 0      # free memory after the last collection
+        self.frame_alloc = 0     # most bytes allocated per frame seen
+        self.threshold = 0       # gc.threshold() set, 0 while unmeasured
+        self.boot = []           # (subsystem, bytes)
+        self.t0 = time.monotonic_ns()
+        if ACTIVE:
+            gc.collect()
+        self._boot_free = mem_free()
+
+    def boot_mark(self, name):
+        """Charge memory used since the previous mark to subsystem `name`"""
+        if ACTIVE:
+            gc.collect()
+        free = mem_free()
+        self.boot.append((name, self._boot_free - free))
+        self._boot_free = free
+
+    def boot_report(self):
+        if not ACTIVE:
+            return
+        parts = ["MEM boot"]
+        for name, used in self.boot:
+            parts.append("%s=%d" % (name, used))
+        parts.append("free=%d" % mem_free())
+        now = time.monotonic_ns()
+        parts.append("menu=%dms code=%dms" % (now // 1000000, (now - self.t0) // 1000000))
+        print(" ".join(parts))
+
+    def free_collected(self):
+        """Free memory after a collection, to measure what comes next"""
+        if ACTIVE:
+            gc.collect()
+        return mem_free()
+
+    def loaded(self, name, free_before):
+        """Report the RAM taken by a module imported after boot"""
+        if not ACTIVE:
+            return
+        gc.collect()
+        free = mem_free()
+        print("MEM load %s=%d free=%d" % (name, free_before - free, free))
+
+    def measure_gc(self):
+        """Time a collection of the booted heap; call once boot is done"""
+        if not ACTIVE:
+            return
+        self.gc_us = self._collect()
+        self.free_after = mem_free()
+        self.gc_report()
+
+    def gc_report(self):
+        print("MEM gc=%dus alloc=%dB/frame threshold=%d"
+              % (self.gc_us, self.frame_alloc, self.threshold))
+
+    def _size_threshold(self, free):
+        """Let IDLE_GC_FRAMES frames allocate without an automatic collection"""
+        if self.since_gc:
+            per_frame = (self.free_after - free) // self.since_gc
+            if per_frame > self.frame_alloc:
+                self.frame_alloc = per_frame
+        threshold = self.frame_alloc * IDLE_GC_FRAMES * THRESHOLD_MARGIN
+        if threshold < THRESHOLD_MIN:
+            threshold = THRESHOLD_MIN
+        if threshold != self.threshold and hasattr(gc, "threshold"):
+            gc.threshold(threshold)
+            self.threshold = threshold
+
+    def _collect(self):
+        t0 = time.monotonic_ns()
+        gc.collect()
+        return (time.monotonic_ns() - t0) // 1000
+
+    def _stat(self):
+        s = self.stats.get(self.mode)
+        if s is None:
+            s = [0x7FFFFFFF, 0, 0, 0, 0]
+            self.stats[self.mode] = s
+        return s
+
+    def _sample(self, s):
+        free = mem_free()
+        if free < s[0]:
+            s[0] = free
+        return free
+
+    def _count(self, s, us, idle):
+        s[2 if idle else 1] += 1
+        s[3] += us
+        if us > s[4]:
+            s[4] = us
+        self.gc_us = us
+        self.since_gc = 0
+        self.free_after = mem_free()
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.frames = 0
+
+    def safe_point(self):
+        """Collect now; the caller knows a pause will not show"""
+        if not ACTIVE:
+            return
+        s = self._stat()
+        self._sample(s)
+        self._count(s, self._collect(), False)
+
+    def idle_sleep(self, clock, seconds):
+        """End-of-frame sleep that hides a periodic collection
+
+        Every IDLE_GC_FRAMES frames the allocation per frame is measured and
+        the threshold resized. The collection only runs if the last one
+        measured fits in `seconds`; otherwise it waits for a frame with a
+        longer sleep or a safe point.
+        """
+        self.frames += 1
+        self.since_gc += 1
+        if ACTIVE and self.frames >= IDLE_GC_FRAMES:
+            self.frames = 0
+            s = self._stat()
+            self._size_threshold(self._sample(s))
+            if self.gc_us < seconds * 1000000:
+                us = self._collect()
+                self._count(s, us, True)
+                seconds -= us / 1000000
+        if seconds > 0:
+            clock.sleep(seconds)
+
+    def report(self, mode=None):
+        mode = mode or self.mode
+        s = self.stats.get(mode)
+        if s is None:
+            return
+        gcs = s[1] + s[2]
+        avg = s[3] / gcs / 1000 if gcs else 0
+        print("MEM mode=%s low=%d gcs=%d+%d gc_avg=%.1fms gc_max=%.1fms"
+              % (mode, s[0], s[1], s[2], avg, s[4] / 1000))
+        self.gc_report()
+
+# The game's single manager; created when claw.py first imports this module
+mem = MemoryManager()
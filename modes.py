@@ -0,0 +1,366 @@
+"""Single-player modes: EASY, MEDIUM and HARD
+
+Imported from the menu the first time one of them is chosen. The core loop
+calls start(mode) to begin a game and frame() once per main-loop iteration.
+"""
+
+import random
+import hal
+import memman
+import governor
+import audio
+import leds
+import sensors
+import scores
+from ui import SCREEN_WIDTH, CLAW_WIDTH, DROP_STEPS, DROP_STEP_PIXELS
+from ui import Label, FONT, splash, set_claw_y, set_claw_x, show_claw, claw_line1
+from ui import title_label, level_label, timer_label, hits_label, message_label
+from profiler import P_ACCEL, P_BALLS, P_LABELS, P_ACTION
+
+BALL_WIDTH = 18
+BALL_Y = 60
+
+# MEDIUM mode settings
+MEDIUM_MAX_BALLS = 3
+MEDIUM_BALL_MIN_LIFE = 1.0
+MEDIUM_BALL_MAX_LIFE = 3.0
+MEDIUM_SPAWN_CHANCE = 0.08    # per 15 ms frame
+
+# HARD mode settings
+HARD_BASE_SPEED = 0.7
+HARD_SPEED_STEP = 0.25
+
+# Level data
+LEVEL_DATA = [
+    (30.0, 3), (30.0, 4), (30.0, 5), (25.0, 5), (25.0, 6),
+    (20.0, 6), (20.0, 7), (15.0, 7), (15.0, 8), (12.0, 8),
+]
+
+mem = memman.mem
+
+# Game state variables
+game_mode = None  # "EASY", "MEDIUM", "HARD"
+current_level_index = 0
+time_limit = 0.0
+target_hits = 0
+hits_remaining = 0
+round_start_time = 0.0
+game_state = "PLAYING"
+lives = 3
+
+medium_balls = []
+hard_balls = []
+pace = governor.Pace()
+
+# Single-player ball
+ball_x = 0          # placed by reset_ball() when a level starts
+ball_label = Label(FONT, text="*", color=0xFFFFFF, x=ball_x, y=BALL_Y)
+splash.append(ball_label)
+ball_label.hidden = True
+
+# Single-player ball functions
+def reset_ball():
+    global ball_x
+    ball_x = random.randint(BALL_WIDTH, SCREEN_WIDTH - BALL_WIDTH)
+    ball_label.x = ball_x
+
+def check_hit_easy():
+    claw_left = claw_line1.x
+    claw_right = claw_left + CLAW_WIDTH
+    ball_center = ball_x + BALL_WIDTH // 4
+    return (ball_center >= claw_left) and (ball_center <= claw_right)
+
+# MEDIUM mode functions
+def clear_medium_balls():
+    global medium_balls
+    for b in medium_balls:
+        if b["label"] in splash:
+            splash.remove(b["label"])
+    medium_balls = []
+
+def spawn_medium_ball():
+    global medium_balls
+    if len(medium_balls) >= MEDIUM_MAX_BALLS:
+        return
+    x = random.randint(0, SCREEN_WIDTH - BALL_WIDTH)
+    life = random.uniform(MEDIUM_BALL_MIN_LIFE, MEDIUM_BALL_MAX_LIFE)
+    expire = hal.clock.monotonic() + life
+    lbl = Label(FONT, text="*", color=0xFFFFFF, x=x, y=BALL_Y)
+    splash.append(lbl)
+    medium_balls.append({"label": lbl, "x": x, "expire": expire})
+
+def update_medium_balls(steps=1.0):
+    global medium_balls
+    now = hal.clock.monotonic()
+    still_alive = []
+    for b in medium_balls:
+        if now > b["expire"]:
+            if b["label"] in splash:
+                splash.remove(b["label"])
+        else:
+            still_alive.append(b)
+    medium_balls = still_alive
+    if len(medium_balls) < MEDIUM_MAX_BALLS:
+        if random.random() < MEDIUM_SPAWN_CHANCE * steps:
+            spawn_medium_ball()
+
+def check_hit_medium():
+    global medium_balls
+    claw_left = claw_line1.x
+    claw_right = claw_left + CLAW_WIDTH
+    for i, b in enumerate(medium_balls):
+        ball_center = b["x"] + BALL_WIDTH // 2
+        if (ball_center >= claw_left) and (ball_center <= claw_right):
+            if b["label"] in splash:
+                splash.remove(b["label"])
+            del medium_balls[i]
+            return True
+    return False
+
+# HARD mode functions
+def clear_hard_balls():
+    global hard_balls
+    for b in hard_balls:
+        if b["label"] in splash:
+            splash.remove(b["label"])
+    hard_balls = []
+
+def hard_speed_for_level():
+    return HARD_BASE_SPEED + HARD_SPEED_STEP * current_level_index
+
+def hard_num_balls_for_level():
+    level = current_level_index + 1
+    if level <= 7:
+        return 1
+    elif level <= 9:
+        return 2
+    else:
+        return 3
+
+def spawn_hard_ball(speed):
+    global hard_balls
+    x = random.randint(0, SCREEN_WIDTH - BALL_WIDTH)
+    direction = 1 if random.random() < 0.5 else -1
+    vx = speed * direction
+    lbl = Label(FONT, text="*", color=0xFFFFFF, x=int(x), y=BALL_Y)
+    splash.append(lbl)
+    hard_balls.append({"label": lbl, "x": float(x), "vx": float(vx)})
+
+def init_hard_balls_for_level():
+    clear_hard_balls()
+    speed = hard_speed_for_level()
+    num = hard_num_balls_for_level()
+    for _ in range(num):
+        spawn_hard_ball(speed)
+
+def update_hard_balls(steps=1.0):
+    """Move the targets by `steps` frames of their speed"""
+    max_x = SCREEN_WIDTH - BALL_WIDTH
+    for b in hard_balls:
+        x = b["x"] + b["vx"] * steps
+        if x < 0:
+            x = 0
+            b["vx"] = abs(b["vx"])
+        elif x > max_x:
+            x = max_x
+            b["vx"] = -abs(b["vx"])
+        b["x"] = x
+        b["label"].x = int(x)
+
+def check_hit_hard():
+    global hard_balls
+    claw_left = claw_line1.x
+    claw_right = claw_left + CLAW_WIDTH
+    for i, b in enumerate(hard_balls):
+        ball_center = b["x"] + BALL_WIDTH / 2
+        if (ball_center >= claw_left) and (ball_center <= claw_right):
+            if b["label"] in splash:
+                splash.remove(b["label"])
+            del hard_balls[i]
+            speed = hard_speed_for_level()
+            spawn_hard_ball(speed)
+            return True
+    return False
+
+# Game start and levels
+def start(mode, tap=None):
+    global game_mode, current_level_index
+
+    game_mode = mode
+    sensors.calibrate()
+    current_level_index = 0
+    title_label.text = mode
+    start_level_same_difficulty()
+    show_claw(True)
+
+def start_level_same_difficulty():
+    global time_limit, target_hits, hits_remaining, round_start_time, game_state, lives
+
+    time_limit, target_hits = LEVEL_DATA[current_level_index]
+    hits_remaining = target_hits
+    round_start_time = hal.clock.monotonic()
+    game_state = "PLAYING"
+    pace.reset()
+
+    level_label.text = f"Lv{current_level_index + 1}"
+    timer_label.text = f"{time_limit:4.1f}"
+    hits_label.text = str(hits_remaining)
+    message_label.text = ""
+
+    if game_mode in ("MEDIUM", "HARD"):
+        lives = 3
+        leds.update_health_bar(lives)
+    else:
+        leds.clear_health_bar()
+
+    if game_mode == "EASY":
+        ball_label.hidden = False
+        reset_ball()
+        clear_medium_balls()
+        clear_hard_balls()
+    elif game_mode == "MEDIUM":
+        ball_label.hidden = True
+        clear_medium_balls()
+        clear_hard_balls()
+        for _ in range(random.randint(1, MEDIUM_MAX_BALLS)):
+            spawn_medium_ball()
+    elif game_mode == "HARD":
+        ball_label.hidden = True
+        clear_medium_balls()
+        init_hard_balls_for_level()
+
+    # A new level is on screen (or the jingle follows), so a pause goes unnoticed
+    mem.safe_point()
+
+def hide():
+    """Take this mode's targets off the screen"""
+    ball_label.hidden = True
+    clear_medium_balls()
+    clear_hard_balls()
+
+def digest_values():
+    values = [hits_remaining, lives, current_level_index]
+    for b in medium_balls:
+        values.append(b["x"])
+    for b in hard_balls:
+        values.append(int(b["x"]))
+    return values
+
+def save_result(won):
+    """Record the finished game and write it out while the end screen is up"""
+    scores.store.single_result(game_mode, current_level_index + 1, won)
+    scores.store.commit()
+
+# Drop claw animation
+def drop_claw():
+    global hits_remaining, game_state, current_level_index, lives
+
+    if game_state != "PLAYING":
+        return
+
+    # Drop animation, a pixel per GRAB_STEP; targets move a frame's worth
+    # per DROP_STEP_PIXELS, as fast as they always have during a grab
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS + 1):
+        set_claw_y(offset)
+        if game_mode == "MEDIUM":
+            update_medium_balls(1 / DROP_STEP_PIXELS)
+        elif game_mode == "HARD":
+            update_hard_balls(1 / DROP_STEP_PIXELS)
+        hal.clock.sleep(governor.GRAB_STEP)
+
+    # Check hit
+    if game_mode == "EASY":
+        hit = check_hit_easy()
+    elif game_mode == "MEDIUM":
+        hit = check_hit_medium()
+    else:
+        hit = check_hit_hard()
+
+    if hit:
+        audio.sfx_hit()
+        if game_mode == "EASY":
+            reset_ball()
+        hits_remaining -= 1
+        if hits_remaining < 0:
+            hits_remaining = 0
+        hits_label.text = str(hits_remaining)
+
+        if hits_remaining == 0:
+            if current_level_index < len(LEVEL_DATA) - 1:
+                current_level_index += 1
+                start_level_same_difficulty()
+                audio.sfx_level_up()
+            else:
+                game_state = "WIN"
+                message_label.text = "YOU WIN!"
+                save_result(True)
+                mem.safe_point()
+    else:
+        audio.sfx_miss()
+        if game_mode in ("MEDIUM", "HARD"):
+            lives -= 1
+            if lives < 0:
+                lives = 0
+            leds.update_health_bar(lives)
+            if lives == 0:
+                game_state = "GAME_OVER"
+                message_label.text = "GAME OVER"
+                audio.sfx_game_over()
+                save_result(False)
+                mem.safe_point()
+
+    hal.clock.sleep(0.15)
+
+    # Raise claw
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS, -1, -1):
+        set_claw_y(offset)
+        if game_mode == "MEDIUM":
+            update_medium_balls(1 / DROP_STEP_PIXELS)
+        elif game_mode == "HARD":
+            update_hard_balls(1 / DROP_STEP_PIXELS)
+        hal.clock.sleep(governor.GRAB_STEP)
+    pace.reset()
+
+def frame(button_pressed, tap, prof):
+    """One main-loop iteration; True when the player leaves the end screen"""
+    global game_state
+
+    now = hal.clock.monotonic()
+    steps = pace.steps(now)
+    elapsed = now - round_start_time
+    remaining = time_limit - elapsed
+    if remaining < 0:
+        remaining = 0.0
+
+    timer_label.text = f"{remaining:4.1f}"
+    prof.mark(P_LABELS)
+
+    if game_state == "PLAYING" and remaining <= 0 and hits_remaining > 0:
+        game_state = "GAME_OVER"
+        message_label.text = "GAME OVER"
+        audio.sfx_game_over()
+        save_result(False)
+        mem.safe_point()
+    prof.mark(P_ACTION)
+
+    if game_state == "PLAYING":
+        if game_mode == "MEDIUM":
+            update_medium_balls(steps)
+        elif game_mode == "HARD":
+            update_hard_balls(steps)
+    prof.mark(P_BALLS)
+
+    # Read accelerometer
+    claw_x = sensors.claw_x(sensors.read_filtered(tap, steps))
+    prof.mark(P_ACCEL)
+    set_claw_x(claw_x)
+    prof.mark(P_LABELS)
+
+    done = False
+    if button_pressed:
+        if game_state == "PLAYING" and remaining > 0:
+            drop_claw()
+        elif game_state in ("GAME_OVER", "WIN"):
+            done = True
+    prof.mark(P_ACTION)
+    return done
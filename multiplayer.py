@@ -0,0 +1,231 @@
+"""MULTIPLAYER: the shooter side of the two-board game
+
+Imported from the menu the first time MULTIPLAYER is chosen; that is also
+when the UART is opened. The dodger board sends its position as "P:<x>",
+this board sends "AIM:<tilt>" and "FIRE:1".
+"""
+
+import hal
+import memman
+import governor
+import audio
+import leds
+import sensors
+import scores
+from ui import SCREEN_WIDTH, CLAW_WIDTH, DROP_STEPS, DROP_STEP_PIXELS
+from ui import Label, FONT, splash, set_claw_y, set_claw_x, show_claw, claw_line1
+from ui import title_label, level_label, timer_label, hits_label, message_label
+from profiler import P_ACCEL, P_LABELS, P_ACTION, P_UART
+
+# MULTIPLAYER SETTINGS
+PLAYER_WIDTH = 8
+PLAYER_Y = 52
+MP_ROUND_TIME = 120.0  # 2 minutes
+MP_HIT_POINTS = 3      # Points for hitting dodger
+MP_MISS_POINTS = 1     # Points for dodger when you miss
+AIM_SEND_INTERVAL = 0.03
+
+hw = hal.get()
+mem = memman.mem
+
+# UART link; a replay swaps in recorder.NullUART for the session
+board_uart = hw.open_uart()
+uart = board_uart
+
+# Multiplayer variables
+game_state = "PLAYING"
+player_x = SCREEN_WIDTH // 2
+last_aim_sent = 0.0
+claw_dropping = False
+mp_score_shooter = 0
+mp_score_dodger = 0
+mp_round_start = 0.0
+
+# Player dot
+player_label = Label(FONT, text="*", color=0xFFFFFF, x=player_x, y=PLAYER_Y)
+splash.append(player_label)
+player_label.hidden = True
+
+def available():
+    return board_uart is not None
+
+def start(mode="MULTIPLAYER", tap=None):
+    global game_state, mp_round_start, mp_score_shooter, mp_score_dodger, player_x, uart
+
+    uart = board_uart
+    if tap is not None and tap.replaying:
+        import recorder
+        uart = recorder.NullUART()
+
+    game_state = "PLAYING"
+    mp_score_shooter = 0
+    mp_score_dodger = 0
+    mp_round_start = hal.clock.monotonic()
+    leds.update_mp_health_bar(0)
+
+    title_label.text = "SHOOTER"
+    level_label.text = f"You:{mp_score_shooter}"
+    timer_label.text = f"{MP_ROUND_TIME:.0f}"
+    hits_label.text = f"Opp:{mp_score_dodger}"
+    message_label.text = ""
+
+    player_label.hidden = False
+    player_x = SCREEN_WIDTH // 2
+    player_label.x = player_x
+    show_claw(True)
+
+def hide():
+    player_label.hidden = True
+
+def digest_values():
+    return [player_x, mp_score_shooter, mp_score_dodger]
+
+# Multiplayer UART functions
+def process_uart(tap=None):
+    """Receive player position from dodger"""
+    global player_x
+    latest_x = None
+    while True:
+        try:
+            data = uart.readline()
+        except Exception:
+            break
+        if not data:
+            break
+        try:
+            msg = data.decode().strip()
+        except Exception:
+            continue
+
+        if msg.startswith("P:"):
+            try:
+                val_str = msg.split(":", 1)[1]
+                val = int(val_str)
+                latest_x = val
+            except Exception:
+                pass
+
+    if tap is not None:
+        latest_x = tap.uart(latest_x)
+
+    if latest_x is not None:
+        player_x = latest_x
+        player_label.x = player_x
+
+def send_fire():
+    """Send fire command to dodger"""
+    try:
+        uart.write("FIRE:1\n".encode())
+    except Exception:
+        pass
+
+def send_aim_position(accel_val):
+    """Send aim position to dodger"""
+    global last_aim_sent
+    now = hal.clock.monotonic()
+    if now - last_aim_sent < AIM_SEND_INTERVAL:
+        return
+    try:
+        msg = f"AIM:{accel_val:.1f}\n"
+        uart.write(msg.encode())
+        last_aim_sent = now
+    except Exception:
+        pass
+
+def drop_claw_mp():
+    """Multiplayer claw drop with hit detection"""
+    global mp_score_shooter, mp_score_dodger
+
+    # Drop animation, a pixel per GRAB_STEP
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS + 1):
+        set_claw_y(offset)
+        hal.clock.sleep(governor.GRAB_STEP)
+
+    # Check if hit
+    claw_left = claw_line1.x
+    claw_right = claw_left + CLAW_WIDTH
+    player_center = player_x + PLAYER_WIDTH // 2
+
+    if (player_center >= claw_left) and (player_center <= claw_right):
+        # HIT!
+        mp_score_shooter += MP_HIT_POINTS
+        audio.sfx_mp_hit()
+        leds.flash_leds_gradient(mp_score_shooter - mp_score_dodger)
+    else:
+        # MISS!
+        mp_score_dodger += MP_MISS_POINTS
+        audio.sfx_mp_miss()
+        leds.flash_leds_red(mp_score_shooter - mp_score_dodger)
+
+    level_label.text = f"You:{mp_score_shooter}"
+    hits_label.text = f"Opp:{mp_score_dodger}"
+
+    hal.clock.sleep(0.15)
+
+    # Raise claw
+    for offset in range(DROP_STEPS * DROP_STEP_PIXELS, -1, -1):
+        set_claw_y(offset)
+        hal.clock.sleep(governor.GRAB_STEP)
+
+def frame(button_pressed, tap, prof):
+    """One main-loop iteration; True when the player leaves the end screen"""
+    global game_state, claw_dropping
+
+    # Check timer
+    now = hal.clock.monotonic()
+    elapsed = now - mp_round_start
+    remaining = MP_ROUND_TIME - elapsed
+    if remaining < 0:
+        remaining = 0.0
+
+    timer_label.text = f"{remaining:.0f}s"
+    prof.mark(P_LABELS)
+
+    # Check if time's up
+    if game_state == "PLAYING" and remaining <= 0:
+        game_state = "GAME_OVER"
+        if mp_score_shooter > mp_score_dodger:
+            message_label.text = "YOU WIN!"
+            audio.sfx_level_up()
+        elif mp_score_shooter < mp_score_dodger:
+            message_label.text = "YOU LOSE!"
+            audio.sfx_game_over()
+        else:
+            message_label.text = "TIE!"
+        scores.store.mp_result(mp_score_shooter, mp_score_dodger)
+        scores.store.commit()
+        mem.safe_point()
+    prof.mark(P_ACTION)
+
+    # Process incoming player position (less often on the end screen)
+    if governor.gov.uart:
+        process_uart(tap)
+    prof.mark(P_UART)
+
+    # Read accelerometer for aiming
+    raw_x = sensors.read_raw(tap)
+
+    # Update local claw position
+    claw_x = sensors.claw_x(raw_x)
+    prof.mark(P_ACCEL)
+    if not claw_dropping:
+        set_claw_x(claw_x)
+    prof.mark(P_LABELS)
+
+    # Send aim position to dodger
+    if game_state == "PLAYING":
+        send_aim_position(raw_x)
+    prof.mark(P_UART)
+
+    # Fire button
+    done = False
+    if button_pressed:
+        if game_state == "PLAYING" and not claw_dropping:
+            send_fire()
+            claw_dropping = True
+            drop_claw_mp()
+            claw_dropping = False
+        elif game_state == "GAME_OVER":
+            done = True
+    prof.mark(P_ACTION)
+    return done
@@ -0,0 +1,111 @@
+"""Per-phase frame profiler for the main loop
+
+Each phase of a main-loop iteration is timed with monotonic_ns() markers and
+stored (in microseconds) in a preallocated ring buffer. On CircuitPython
+monotonic_ns() returns a long int once the board has been up for a second,
+so every marker allocates a few small objects while profiling is on; with
+it off, nothing is read or allocated. Every `dump_every` frames a compact
+summary is printed on the serial console:
+
+    PROF n=128 free=61248 input=41/44/66 accel=810/834/1020 ... total=...
+
+Values are min/avg/p99 in microseconds over the last `n` frames; free is
+gc.mem_free(). tools/parse_profile.py turns a console log into a table.
+
+Toggle at runtime by typing "p" in the serial console.
+"""
+
+import gc
+from array import array
+
+PHASES = ("input", "accel", "balls", "labels", "action", "refresh", "uart", "sleep")
+P_INPUT = 0
+P_ACCEL = 1
+P_BALLS = 2
+P_LABELS = 3
+P_ACTION = 4
+P_REFRESH = 5
+P_UART = 6
+P_SLEEP = 7
+
+TOGGLE_KEY = "p"
+
+class FrameProfiler:
+    def __init__(self, clock, frames=128, dump_every=256, enabled=False):
+        self.clock = clock
+        self.phases = len(PHASES)
+        self.frames = frames
+        self.dump_every = dump_every
+        self.enabled = enabled
+        # samples[frame * phases + phase] = microseconds
+        self.samples = array("L", [0] * (frames * self.phases))
+        self.slot = 0
+        self.count = 0
+        self.last = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.slot = 0
+        self.count = 0
+        print("PROF", "on" if self.enabled else "off")
+
+    def start(self):
+        """Begin a frame"""
+        if not self.enabled:
+            return
+        base = self.slot * self.phases
+        for i in range(self.phases):
+            self.samples[base + i] = 0
+        self.last = self.clock.monotonic_ns()
+
+    def mark(self, phase):
+        """Charge the time since the previous marker to `phase`"""
+        if not self.enabled:
+            return
+        now = self.clock.monotonic_ns()
+        self.samples[self.slot * self.phases + phase] += (now - self.last) // 1000
+        self.last = now
+
+    def end(self):
+        """Finish a frame; dumps a summary every dump_every frames"""
+        if not self.enabled:
+            return
+        self.slot += 1
+        if self.slot >= self.frames:
+            self.slot = 0
+        self.count += 1
+        if self.count % self.dump_every == 0:
+            self.dump()
+
+    def _stats(self, phase, n):
+        # min/avg/p99 of one column; p99 keeps the k largest values only
+        k = n - int(0.99 * (n - 1))
+        top = [0] * k
+        lo = 0xFFFFFFFF
+        total = 0
+        for f in range(n):
+            if phase is None:
+                v = 0
+                base = f * self.phases
+                for i in range(self.phases):
+                    v += self.samples[base + i]
+            else:
+                v = self.samples[f * self.phases + phase]
+            total += v
+            if v < lo:
+                lo = v
+            if v > top[0]:
+                top[0] = v
+                top.sort()
+        return lo, total // n, top[0]
+
+    def dump(self):
+        n = self.count if self.count < self.frames else self.frames
+        if n == 0:
+            return
+        free = gc.mem_free() if hasattr(gc, "mem_free") else -1
+        parts = ["PROF n=%d free=%d" % (n, free)]
+        for i, name in enumerate(PHASES):
+            parts.append("%s=%d/%d/%d" % ((name,) + self._stats(i, n)))
+        parts.append("total=%d/%d/%d" % self._stats(None, n))
+        print(" ".join(parts))
@@ -0,0 +1,317 @@
+"""Input recording and deterministic replay
+
+A recording covers one game session, from leaving the menu until returning
+to it. It holds everything the game logic reads from the outside world:
+
+    TIME   every clock.monotonic() read (delta in microseconds, varint)
+    FRAME  button press edge and encoder step of each loop iteration
+    ACCEL  the accelerometer value the frame uses (filtered x in single
+           player, raw x in MULTIPLAYER), in milli-m/s^2
+    UART   dodger position received this frame, if any
+    SEED   the seed given to `random` for the session
+    CHECK  16-bit digest of the game state after each frame
+
+Every record is a tag byte plus a small payload. Records are collected in
+two preallocated buffers and written to flash only from end_frame(), which
+the loop calls just before its end-of-frame sleep: once less than HEADROOM
+is left the buffer is written there. A frame that overruns the buffer carries on
+in the spare one, so no write ever happens in the middle of a frame.
+
+While recording, the game runs on the quantised values that get stored, so
+replaying on the same platform reproduces every frame exactly; CHECK records
+flag the first frame that differs. Replaying a board recording on a host
+matches until float rounding differs (CircuitPython floats are 30 bit).
+
+CIRCUITPY is read-only to code while it is mounted over USB; recording on
+the board needs a boot.py that calls storage.remount("/", readonly=False).
+"""
+
+import struct
+
+MAGIC = b"CLRC"
+VERSION = 3     # 2: modules load before the seed; 3: speeds scale with frame time
+HEADER = "<4sBBf"
+HEADER_SIZE = struct.calcsize(HEADER)
+CHUNK = 512
+HEADROOM = 128      # bytes free at the end of a frame; one frame records far less
+
+TAG_FRAME = 1
+TAG_TIME = 2
+TAG_ACCEL = 3
+TAG_UART = 4
+TAG_SEED = 5
+TAG_CHECK = 6
+TAG_END = 7
+
+FLAG_BUTTON = 0x01
+FLAG_ENC_UP = 0x02
+FLAG_ENC_DOWN = 0x04
+
+def _f32(x):
+    return struct.unpack("<f", struct.pack("<f", x))[0]
+
+def digest(values):
+    """16-bit digest of a sequence of ints"""
+    h = 0
+    for v in values:
+        h = (h * 31 + v) & 0xFFFF
+    return h
+
+class TapClock:
+    """Clock that routes monotonic() through a Recorder or Replayer"""
+
+    def __init__(self, clock, tap, sleep=True):
+        self.clock = clock
+        self.tap = tap
+        self.real_sleep = sleep
+
+    def monotonic(self):
+        return self.tap.time(self.clock.monotonic())
+
+    def monotonic_ns(self):
+        return self.clock.monotonic_ns()
+
+    def sleep(self, seconds):
+        if self.real_sleep:
+            self.clock.sleep(seconds)
+
+class NullUART:
+    """Stands in for the UART during replay; positions come from the recording"""
+
+    def readline(self):
+        return None
+
+    def write(self, data):
+        return len(data)
+
+class Recorder:
+    replaying = False
+
+    def __init__(self, f, mode_index, start_time, chunk=CHUNK):
+        self.f = f
+        self.buf = bytearray(chunk)
+        self.spare = bytearray(chunk)
+        self.pos = 0
+        self.full = 0           # bytes waiting in spare after a mid-frame overrun
+        self.base = _f32(start_time)
+        self.last_us = 0
+        self.frames = 0
+        self.bytes = HEADER_SIZE
+        f.write(struct.pack(HEADER, MAGIC, VERSION, mode_index, self.base))
+
+    def _room(self, n):
+        if self.pos + n <= len(self.buf):
+            return
+        if self.full:
+            # Both buffers filled within one frame; cannot wait for end_frame()
+            self.flush()
+            return
+        # Carry on in the spare buffer; end_frame() writes the full one
+        self.buf, self.spare = self.spare, self.buf
+        self.full = self.pos
+        self.pos = 0
+
+    def end_frame(self):
+        """Write buffered records once the buffer is nearly full; call between frames"""
+        if self.full or self.pos > len(self.buf) - HEADROOM:
+            self.flush()
+
+    def flush(self):
+        if self.full:
+            self.f.write(memoryview(self.spare)[:self.full])
+            self.bytes += self.full
+            self.full = 0
+        if self.pos:
+            self.f.write(memoryview(self.buf)[:self.pos])
+            self.bytes += self.pos
+            self.pos = 0
+
+    def _tag(self, tag, size):
+        self._room(size + 1)
+        self.buf[self.pos] = tag
+        self.pos += 1
+
+    def time(self, raw):
+        us = int((raw - self.base) * 1000000)
+        if us < self.last_us:
+            us = self.last_us
+        delta = us - self.last_us
+        self.last_us = us
+        self._tag(TAG_TIME, 5)
+        while delta >= 0x80:
+            self.buf[self.pos] = (delta & 0x7F) | 0x80
+            self.pos += 1
+            delta >>= 7
+        self.buf[self.pos] = delta
+        self.pos += 1
+        return self.base + us / 1000000
+
+    def frame(self, pressed, step):
+        flags = 0
+        if pressed:
+            flags |= FLAG_BUTTON
+        if step > 0:
+            flags |= FLAG_ENC_UP
+        elif step < 0:
+            flags |= FLAG_ENC_DOWN
+        self._tag(TAG_FRAME, 1)
+        self.buf[self.pos] = flags
+        self.pos += 1
+        self.frames += 1
+        return pressed, step
+
+    def accel(self, x):
+        code = int(round(x * 1000))
+        if code > 32767:
+            code = 32767
+        elif code < -32768:
+            code = -32768
+        self._tag(TAG_ACCEL, 2)
+        struct.pack_into("<h", self.buf, self.pos, code)
+        self.pos += 2
+        return code / 1000
+
+    def uart(self, x):
+        if x is None:
+            return None
+        if x > 32767:
+            x = 32767
+        elif x < -32768:
+            x = -32768
+        self._tag(TAG_UART, 2)
+        struct.pack_into("<h", self.buf, self.pos, x)
+        self.pos += 2
+        return x
+
+    def seed(self, value):
+        self._tag(TAG_SEED, 4)
+        struct.pack_into("<I", self.buf, self.pos, value)
+        self.pos += 4
+        return value
+
+    def check(self, value):
+        self._tag(TAG_CHECK, 2)
+        struct.pack_into("<H", self.buf, self.pos, value)
+        self.pos += 2
+
+    def close(self):
+        self._tag(TAG_END, 0)
+        self.flush()
+        self.f.close()
+
+class Replayer:
+    replaying = True
+
+    def __init__(self, f, chunk=CHUNK):
+        self.f = f
+        self.chunk = chunk
+        self.buf = b""
+        self.pos = 0
+        magic, version, self.mode_index, self.base = struct.unpack(HEADER, f.read(HEADER_SIZE))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a recording")
+        self.last_us = 0
+        self.frames = 0
+        self.mismatch = None    # first frame whose CHECK differed
+        self.desync = None      # frame where the record stream stopped matching the code path
+
+    def _fill(self, n):
+        if len(self.buf) - self.pos >= n:
+            return True
+        more = self.f.read(self.chunk)
+        self.buf = self.buf[self.pos:] + (more or b"")
+        self.pos = 0
+        return len(self.buf) >= n
+
+    def _peek(self):
+        if not self._fill(1):
+            return None
+        return self.buf[self.pos]
+
+    def _expect(self, tag, size):
+        if self.desync is not None:
+            return False
+        if self._peek() != tag or not self._fill(size + 1):
+            self.desync = self.frames
+            return False
+        self.pos += 1
+        return True
+
+    def end_frame(self):
+        """Read the next chunk between frames once the buffer runs low"""
+        self._fill(HEADROOM)
+
+    def at_end(self):
+        return self.desync is not None or self._peek() in (None, TAG_END)
+
+    def time(self, raw):
+        if self._expect(TAG_TIME, 1):
+            delta = 0
+            shift = 0
+            while self._fill(1):
+                b = self.buf[self.pos]
+                self.pos += 1
+                delta |= (b & 0x7F) << shift
+                shift += 7
+                if not b & 0x80:
+                    break
+            self.last_us += delta
+        return self.base + self.last_us / 1000000
+
+    def frame(self, pressed, step):
+        if not self._expect(TAG_FRAME, 1):
+            return False, 0
+        flags = self.buf[self.pos]
+        self.pos += 1
+        self.frames += 1
+        step = 0
+        if flags & FLAG_ENC_UP:
+            step = 1
+        elif flags & FLAG_ENC_DOWN:
+            step = -1
+        return bool(flags & FLAG_BUTTON), step
+
+    def accel(self, x):
+        if not self._expect(TAG_ACCEL, 2):
+            return x
+        code = struct.unpack_from("<h", self.buf, self.pos)[0]
+        self.pos += 2
+        return code / 1000
+
+    def uart(self, x):
+        if self.desync is not None or self._peek() != TAG_UART:
+            return None
+        self._expect(TAG_UART, 2)
+        x = struct.unpack_from("<h", self.buf, self.pos)[0]
+        self.pos += 2
+        return x
+
+    def seed(self, value):
+        if not self._expect(TAG_SEED, 4):
+            return value
+        value = struct.unpack_from("<I", self.buf, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def check(self, value):
+        if not self._expect(TAG_CHECK, 2):
+            return
+        recorded = struct.unpack_from("<H", self.buf, self.pos)[0]
+        self.pos += 2
+        if recorded != value and self.mismatch is None:
+            self.mismatch = self.frames
+
+    def close(self):
+        self.f.close()
+
+def record(path, mode_index, start_time):
+    """Open a Recorder on `path`, or None if the file cannot be written"""
+    try:
+        f = open(path, "wb")
+    except OSError as e:
+        print("Recording disabled:", e)
+        return None
+    return Recorder(f, mode_index, start_time)
+
+def replay(path):
+    return Replayer(open(path, "rb"))
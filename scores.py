@@ -0,0 +1,218 @@
+"""Persistent high scores and play statistics
+
+Stats are kept in RAM while playing and only written out at safe points:
+the GAME OVER / WIN screens (the mode calls commit() there) and the menu.
+A game never waits on flash.
+
+The store is NVM_SLOTS fixed-size slots at the start of microcontroller.nvm
+(or FILE_PATH when the board has no nvm). Every commit writes the whole
+record to the slot after the newest one, so the writes rotate over all
+slots and the previous record stays intact until the new one is complete.
+A record is
+
+    "CS" version seq | plays x5 | best level x3 | wins x3 |
+    MP won/lost/tied, best MP score | ENDLESS best score, level | CRC-32
+
+At boot every slot is read once; the valid one (magic, version, CRC) with
+the highest seq becomes the index the SCORES screen shows, so a record torn
+by a power cut falls back to the one before it. The menu prints a line
+after commits with the time they took:
+
+    SCORES commits=1 slot=5 seq=21 last=1.9ms max=2.4ms
+"""
+
+import struct
+import time
+from binascii import crc32
+import hal
+
+MODES = ("EASY", "MEDIUM", "HARD", "MULTIPLAYER", "ENDLESS")
+SINGLE_MODES = ("EASY", "MEDIUM", "HARD")
+
+MAGIC = b"CS"
+VERSION = 1
+BODY_FMT = "<2sBI5H3B3H3HHIB"
+BODY_SIZE = struct.calcsize(BODY_FMT)
+RECORD_SIZE = BODY_SIZE + 4
+NVM_OFFSET = 0
+NVM_SLOTS = 16
+FILE_PATH = "/scores.bin"
+
+def _count(value):
+    """Saturate at the u16 field size"""
+    return value if value < 0xFFFF else 0xFFFF
+
+class FileNVM:
+    """microcontroller.nvm stand-in on a writable filesystem (see recorder.py)"""
+
+    def __init__(self, path, size):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self.data = bytearray(f.read(size))
+        except OSError:
+            self.data = bytearray()
+        if len(self.data) < size:
+            self.data.extend(b"\xff" * (size - len(self.data)))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        self.data[index] = value
+        with open(self.path, "wb") as f:
+            f.write(self.data)
+
+class ScoreStore:
+    def __init__(self, nvm):
+        self.nvm = nvm
+        self.slot = -1          # slot of the newest record
+        self.seq = 0
+        self.dirty = False
+        self.paused = False     # replays do not count
+        self.commits = 0        # since the last report()
+        self.last_us = 0
+        self.max_us = 0
+        self.clear()
+        if nvm is not None:
+            self.load()
+
+    def clear(self):
+        self.plays = [0] * len(MODES)
+        self.best_level = [0] * len(SINGLE_MODES)
+        self.wins = [0] * len(SINGLE_MODES)
+        self.mp = [0, 0, 0]     # won, lost, tied
+        self.mp_best = 0
+        self.endless_best = 0
+        self.endless_level = 0
+
+    def load(self):
+        """Index the newest valid record; runs once at boot"""
+        data = bytes(self.nvm[NVM_OFFSET:NVM_OFFSET + NVM_SLOTS * RECORD_SIZE])
+        newest = None
+        bad = 0
+        for slot in range(NVM_SLOTS):
+            rec = data[slot * RECORD_SIZE:(slot + 1) * RECORD_SIZE]
+            if rec[:2] != MAGIC:
+                continue
+            body = rec[:BODY_SIZE]
+            if crc32(body) != struct.unpack("<I", rec[BODY_SIZE:])[0]:
+                bad += 1
+                continue
+            fields = struct.unpack(BODY_FMT, body)
+            if fields[1] != VERSION:
+                continue
+            if newest is None or fields[2] > newest[2]:
+                newest = fields
+                self.slot = slot
+        if bad:
+            print("SCORES skipped", bad, "corrupt slot(s)")
+        if newest is None:
+            return
+        self.seq = newest[2]
+        self.plays = list(newest[3:8])
+        self.best_level = list(newest[8:11])
+        self.wins = list(newest[11:14])
+        self.mp = list(newest[14:17])
+        self.mp_best = newest[17]
+        self.endless_best = newest[18]
+        self.endless_level = newest[19]
+
+    # Stats, in RAM until commit()
+    def played(self, mode):
+        if self.paused or mode not in MODES:
+            return
+        i = MODES.index(mode)
+        self.plays[i] = _count(self.plays[i] + 1)
+        self.dirty = True
+
+    def single_result(self, mode, level, won):
+        """Level reached (1-based) in EASY/MEDIUM/HARD; True if it is a new best"""
+        if self.paused:
+            return False
+        i = SINGLE_MODES.index(mode)
+        if won:
+            self.wins[i] = _count(self.wins[i] + 1)
+        self.dirty = True
+        if level > self.best_level[i]:
+            self.best_level[i] = level
+            return True
+        return False
+
+    def mp_result(self, shooter, dodger):
+        if self.paused:
+            return False
+        if shooter > dodger:
+            self.mp[0] = _count(self.mp[0] + 1)
+        elif shooter < dodger:
+            self.mp[1] = _count(self.mp[1] + 1)
+        else:
+            self.mp[2] = _count(self.mp[2] + 1)
+        self.dirty = True
+        if shooter > self.mp_best:
+            self.mp_best = _count(shooter)
+            return True
+        return False
+
+    def endless_result(self, score, level):
+        if self.paused:
+            return False
+        self.dirty = True
+        if score > self.endless_best:
+            self.endless_best = score
+            self.endless_level = level if level < 0xFF else 0xFF
+            return True
+        return False
+
+    # NVM
+    def pack(self):
+        values = ([MAGIC, VERSION, self.seq] + self.plays + self.best_level + self.wins
+                  + self.mp + [self.mp_best, self.endless_best, self.endless_level])
+        body = struct.pack(BODY_FMT, *values)
+        return body + struct.pack("<I", crc32(body))
+
+    def commit(self, force=False):
+        """Write the stats to the next slot if they changed; returns the time in us"""
+        if self.nvm is None or not (self.dirty or force):
+            return 0
+        t0 = time.monotonic_ns()
+        slot = (self.slot + 1) % NVM_SLOTS
+        self.seq += 1
+        start = NVM_OFFSET + slot * RECORD_SIZE
+        try:
+            self.nvm[start:start + RECORD_SIZE] = self.pack()
+        except OSError as e:
+            # Read-only filesystem: keep playing, stop trying
+            print("SCORES not saved:", e)
+            self.nvm = None
+            return 0
+        us = (time.monotonic_ns() - t0) // 1000
+        self.slot = slot
+        self.dirty = False
+        self.commits += 1
+        self.last_us = us
+        if us > self.max_us:
+            self.max_us = us
+        return us
+
+    def report(self):
+        """One console line if anything was written since the last report"""
+        if not self.commits:
+            return
+        print(f"SCORES commits={self.commits} slot={self.slot} seq={self.seq} "
+              f"last={self.last_us / 1000:.1f}ms max={self.max_us / 1000:.1f}ms")
+        self.commits = 0
+
+def _open_nvm(hw):
+    nvm = getattr(hw, "nvm", None)
+    if nvm is None:
+        nvm = FileNVM(FILE_PATH, NVM_OFFSET + NVM_SLOTS * RECORD_SIZE)
+    if len(nvm) < NVM_OFFSET + NVM_SLOTS * RECORD_SIZE:
+        print("SCORES nvm too small:", len(nvm))
+        return None
+    return nvm
+
+store = ScoreStore(_open_nvm(hal.get()))
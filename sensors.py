@@ -0,0 +1,92 @@
+"""Accelerometer: calibration, filtering and mapping tilt to the claw
+
+Calibration no longer blocks boot: the menu takes one sample per frame while
+the player is choosing, and a single-player game that starts before all
+ACCEL_CALIB_SAMPLES are in finishes the calibration first.
+"""
+
+import hal
+from ui import SCREEN_WIDTH, CLAW_WIDTH
+
+ACCEL_MIN = -4.0
+ACCEL_MAX = 4.0
+
+# Accelerometer calibration + filtering
+ACCEL_CALIB_SAMPLES = 200
+ACCEL_ALPHA = 0.2
+
+accelerometer = hal.get().accelerometer
+
+# Set by the governor on frames that reuse the last sample (see governor.py)
+hold = False
+last_x = 0.0
+
+offset_x = 0.0
+filtered_x = 0.0
+offset_sum = 0.0
+calib_count = 0
+
+def map_range(x, in_min, in_max, out_min, out_max):
+    if x < in_min:
+        x = in_min
+    if x > in_max:
+        x = in_max
+    return out_min + (out_max - out_min) * (x - in_min) / (in_max - in_min)
+
+def claw_x(accel_x):
+    return int(map_range(accel_x, ACCEL_MIN, ACCEL_MAX, 0, SCREEN_WIDTH - CLAW_WIDTH))
+
+def calibrated():
+    return calib_count >= ACCEL_CALIB_SAMPLES
+
+def calibrate_step():
+    """Take one calibration sample"""
+    global offset_x, offset_sum, calib_count
+    if calib_count >= ACCEL_CALIB_SAMPLES:
+        return
+    if calib_count == 0:
+        print("Calibrating accelerometer...")
+    x, y, z = accelerometer.acceleration
+    offset_sum += x
+    calib_count += 1
+    if calib_count == ACCEL_CALIB_SAMPLES:
+        offset_x = offset_sum / ACCEL_CALIB_SAMPLES
+        print("Calibration done, offset_x =", offset_x)
+
+def calibrate():
+    """Finish calibrating; blocks for up to ACCEL_CALIB_SAMPLES * 10 ms"""
+    while not calibrated():
+        calibrate_step()
+        hal.clock.sleep(0.01)
+
+def read_filtered(tap=None, steps=1.0):
+    """Low-pass filtered, calibrated tilt (single player)
+
+    ACCEL_ALPHA is per 15 ms frame; steps is the number of those frames
+    since the last read, so the filter responds the same at any loop rate.
+    """
+    global filtered_x, last_x
+    if not hold:
+        raw_x, raw_y, raw_z = accelerometer.acceleration
+        last_x = raw_x
+        centered_x = raw_x - offset_x
+        alpha = ACCEL_ALPHA if steps == 1.0 else 1.0 - (1.0 - ACCEL_ALPHA) ** steps
+        filtered_x = alpha * centered_x + (1.0 - alpha) * filtered_x
+    if tap is not None:
+        filtered_x = tap.accel(filtered_x)
+    return filtered_x
+
+def read_raw(tap=None):
+    """Unfiltered tilt (multiplayer aiming); 0.0 if the read fails"""
+    global last_x
+    if hold:
+        raw_x = last_x
+    else:
+        try:
+            raw_x, raw_y, raw_z = accelerometer.acceleration
+        except Exception:
+            raw_x = 0.0
+        last_x = raw_x
+    if tap is not None:
+        raw_x = tap.accel(raw_x)
+    return raw_x
@@ -0,0 +1,386 @@
+"""Host-side benchmarks for the claw game hot paths
+
+Micro benchmarks time single functions of the game on the simulated HAL and
+record their memory behaviour; macro benchmarks play full headless games per
+mode (back to back until MACRO_FRAMES frames) and report frames per second.
+The scaling table times one ENDLESS frame's move + hit test at 10/100/500
+targets with the array code and with HARD mode's per-dict loop, plus the
+array side's bitmap redraw on its own; it is informational and not
+compared against the baseline. Results are written as JSON and compared against a stored baseline.
+
+    python3 tools/bench.py                       # run, compare with baseline
+    python3 tools/bench.py --save-baseline       # refresh the baseline
+    python3 tools/bench.py --out bench.json --threshold 0.25
+
+Timings are host timings: use them to compare two versions of the code on
+the same machine, not to predict ESP32-C3 frame times. The baseline is
+machine-specific, so regenerate it before comparing on a new machine.
+
+Memory columns (CPython tracemalloc):
+    peak_bytes   largest transient allocation during one call
+    net_blocks   memory blocks still allocated per call afterwards (leaks,
+                 growing lists)
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import headless
+import sim_hal
+
+DEFAULT_BASELINE = os.path.join(headless.TOOLS_DIR, "bench_baseline.json")
+MACRO_FRAMES = 20000
+
+
+class LinesUART:
+    """Yields the same burst of lines on every process_uart() call"""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.i = 0
+
+    def readline(self):
+        if self.i < len(self.lines):
+            line = self.lines[self.i]
+            self.i += 1
+            return line
+        self.i = 0
+        return None
+
+    def write(self, data):
+        return len(data)
+
+
+def new_game(mode="HARD", level=9, seed=0):
+    """Fresh game in `mode`; returns (claw, mode module, sim)"""
+    sim = sim_hal.SimHAL(seed=seed, uart=None)
+    game = headless.load_game(sim, seed)
+    game.in_menu = False
+    with contextlib.redirect_stdout(sys.stderr):
+        if mode == "MULTIPLAYER":
+            sim.uart = LinesUART([])
+        game.start_mode(mode)
+    m = game.active
+    if mode == "HARD":
+        m.current_level_index = level
+        m.init_hard_balls_for_level()
+    return game, m, sim
+
+
+def claw_away_from(game, centers):
+    """Park the claw where none of `centers` is under it"""
+    ui = game.ui
+    span = ui.SCREEN_WIDTH - ui.CLAW_WIDTH
+    for x in range(0, span + 1, 4):
+        if all(not (x <= c <= x + ui.CLAW_WIDTH) for c in centers):
+            ui.claw_line1.x = x
+            return
+    ui.claw_line1.x = span
+
+
+# Micro benchmark setups: each returns a zero-argument callable
+def setup_update_hard_balls():
+    game, m, _ = new_game("HARD", level=9)
+    return m.update_hard_balls
+
+
+def setup_check_hit_hard_miss():
+    game, m, _ = new_game("HARD", level=9)
+    # Freeze the balls so the claw stays clear of them
+    for b in m.hard_balls:
+        b["x"] = float(game.ui.SCREEN_WIDTH - m.BALL_WIDTH)
+    claw_away_from(game, [b["x"] + m.BALL_WIDTH / 2 for b in m.hard_balls])
+    return m.check_hit_hard
+
+
+def setup_check_hit_hard_hit():
+    game, m, _ = new_game("HARD", level=9)
+    game.ui.claw_line1.x = 0
+    left = game.ui.claw_line1.x
+
+    def call():
+        # Guarantee a hit: the first ball sits under the claw
+        m.hard_balls[0]["x"] = float(left)
+        m.check_hit_hard()
+    return call
+
+
+def setup_check_hit_medium_miss():
+    game, m, _ = new_game("MEDIUM")
+    m.clear_medium_balls()
+    for _ in range(m.MEDIUM_MAX_BALLS):
+        m.spawn_medium_ball()
+    for b in m.medium_balls:
+        b["x"] = game.ui.SCREEN_WIDTH - m.BALL_WIDTH
+    claw_away_from(game, [b["x"] + m.BALL_WIDTH // 2 for b in m.medium_balls])
+    return m.check_hit_medium
+
+
+def setup_map_range():
+    game, _, _ = new_game("HARD")
+    map_range = game.sensors.map_range
+
+    def call():
+        map_range(1.37, -4.0, 4.0, 0, 88)
+    return call
+
+
+def setup_process_uart():
+    game, m, _ = new_game("MULTIPLAYER")
+    m.uart = LinesUART([b"P:17\n", b"P:18\n", b"garbage\n", b"P:x\n", b"P:20\n"])
+    return m.process_uart
+
+
+def setup_hud_update():
+    game, _, _ = new_game("HARD")
+    ui = game.ui
+    timer_label = ui.timer_label
+    hits_label = ui.hits_label
+    claw_lines = (ui.claw_line1, ui.claw_line2, ui.claw_line3)
+
+    def call():
+        timer_label.text = f"{12.345:4.1f}"
+        hits_label.text = str(7)
+        for line in claw_lines:
+            line.x = 42
+    return call
+
+
+def setup_scores_commit():
+    game, _, _ = new_game("HARD")
+    store = game.scores.store
+
+    def call():
+        store.commit(force=True)
+    return call
+
+
+def setup_loop_once_hard():
+    game, m, sim = new_game("HARD", level=9)
+    m.time_limit = 1e9
+
+    def call():
+        game.loop_once()
+    return call
+
+
+MICRO = {
+    "update_hard_balls": setup_update_hard_balls,
+    "check_hit_hard_miss": setup_check_hit_hard_miss,
+    "check_hit_hard_hit": setup_check_hit_hard_hit,
+    "check_hit_medium_miss": setup_check_hit_medium_miss,
+    "map_range": setup_map_range,
+    "process_uart_5_lines": setup_process_uart,
+    "hud_update": setup_hud_update,
+    "scores_commit": setup_scores_commit,
+    "loop_once_hard": setup_loop_once_hard,
+}
+
+
+def time_call(fn, number, repeat):
+    """Best and median ns per call over `repeat` batches of `number` calls"""
+    fn()
+    gc.collect()
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        batches = []
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            for _ in range(number):
+                fn()
+            batches.append((time.perf_counter_ns() - t0) / number)
+    finally:
+        if was_enabled:
+            gc.enable()
+    return min(batches), statistics.median(batches)
+
+
+def memory_call(fn, number):
+    tracemalloc.start()
+    try:
+        fn()
+        peak = 0
+        for _ in range(8):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            _, high = tracemalloc.get_traced_memory()
+            peak = max(peak, high - before)
+        blocks0 = sys.getallocatedblocks()
+        for _ in range(number):
+            fn()
+        net = (sys.getallocatedblocks() - blocks0) / number
+    finally:
+        tracemalloc.stop()
+    return peak, net
+
+
+def run_micro(number, repeat, only=None):
+    results = {}
+    for name, setup in MICRO.items():
+        if only and name not in only:
+            continue
+        best, median = time_call(setup(), number, repeat)
+        peak, net = memory_call(setup(), min(number, 2000))
+        results[name] = {
+            "ns_per_call": round(best, 1),
+            "ns_median": round(median, 1),
+            "peak_bytes": peak,
+            "net_blocks": round(net, 3),
+        }
+    return results
+
+
+def run_macro(repeat, frames=MACRO_FRAMES):
+    """Play seeded games back to back until each mode has `frames` frames"""
+    results = {}
+    for mode in headless.MODES:
+        if not headless.mode_available(mode):
+            continue
+        best = None
+        for _ in range(repeat):
+            total_frames = 0
+            wall = 0.0
+            sim_seconds = 0.0
+            games = 0
+            seed = 1
+            while total_frames < frames:
+                result, _, _ = headless.run_game(mode, seed=seed, frames=frames - total_frames)
+                total_frames += result["frames"]
+                wall += result["wall_seconds"]
+                sim_seconds += result["sim_seconds"]
+                games += 1
+                seed += 1
+            fps = total_frames / wall if wall else 0.0
+            if best is None or fps > best["fps"]:
+                best = {
+                    "fps": round(fps, 1),
+                    "frames": total_frames,
+                    "games": games,
+                    "speedup": round(sim_seconds / wall, 1) if wall else None,
+                }
+        results[mode] = best
+    return results
+
+
+def run_scaling():
+    """ENDLESS frame time per target count, arrays vs dicts (needs numpy)"""
+    if not headless.mode_available("ENDLESS"):
+        return {}
+    game, m, _ = new_game("ENDLESS")
+    with contextlib.redirect_stdout(sys.stderr):
+        modes = game.load("HARD")
+    return {str(n): {"array_us": array_us, "draw_us": draw_us, "dict_us": dict_us}
+            for n, array_us, draw_us, dict_us in m.scaling(time, modes)}
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regression messages"""
+    problems = []
+    for name, cur in current.get("micro", {}).items():
+        base = baseline.get("micro", {}).get(name)
+        if not base:
+            continue
+        if cur["ns_per_call"] > base["ns_per_call"] * (1 + threshold):
+            problems.append(f"micro {name}: {cur['ns_per_call']:.0f} ns/call vs "
+                            f"{base['ns_per_call']:.0f} baseline")
+        # Allocation growth is a regression regardless of timing noise
+        if cur["net_blocks"] > base["net_blocks"] + 0.5:
+            problems.append(f"micro {name}: {cur['net_blocks']} net blocks/call vs "
+                            f"{base['net_blocks']} baseline")
+        if cur["peak_bytes"] > base["peak_bytes"] * (1 + threshold) + 64:
+            problems.append(f"micro {name}: {cur['peak_bytes']} peak bytes vs "
+                            f"{base['peak_bytes']} baseline")
+    for mode, cur in current.get("macro", {}).items():
+        base = baseline.get("macro", {}).get(mode)
+        if not base:
+            continue
+        if cur["fps"] < base["fps"] * (1 - threshold):
+            problems.append(f"macro {mode}: {cur['fps']:.0f} fps vs {base['fps']:.0f} baseline")
+    return problems
+
+
+def print_table(results, baseline):
+    print(f"{'micro':<24}{'ns/call':>10}{'base':>10}{'peak B':>9}{'net blk':>9}")
+    for name, r in results.get("micro", {}).items():
+        base = baseline.get("micro", {}).get(name, {}).get("ns_per_call", "")
+        base = f"{base:.0f}" if base != "" else "-"
+        print(f"{name:<24}{r['ns_per_call']:>10.0f}{base:>10}{r['peak_bytes']:>9}{r['net_blocks']:>9}")
+    print(f"\n{'macro':<24}{'fps':>10}{'base':>10}{'games':>9}{'speedup':>9}")
+    for mode, r in results.get("macro", {}).items():
+        base = baseline.get("macro", {}).get(mode, {}).get("fps", "")
+        base = f"{base:.0f}" if base != "" else "-"
+        print(f"{mode:<24}{r['fps']:>10.0f}{base:>10}{r['games']:>9}{r['speedup']:>9}")
+    if results.get("scaling"):
+        print(f"\n{'endless targets':<24}{'array us':>10}{'dict us':>10}{'draw us':>9}")
+        for n, r in results["scaling"].items():
+            dict_us = r["dict_us"] if r["dict_us"] is not None else "mem"
+            print(f"{n:<24}{r['array_us']:>10}{dict_us:>10}{r['draw_us']:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--out", default="bench.json", help="where to write this run's results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to the baseline file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 = 20%%")
+    parser.add_argument("--number", type=int, default=5000, help="calls per micro batch")
+    parser.add_argument("--repeat", type=int, default=5, help="batches per micro benchmark / games per mode")
+    parser.add_argument("--only", nargs="*", help="micro benchmarks to run (default all)")
+    parser.add_argument("--no-macro", action="store_true")
+    parser.add_argument("--no-scaling", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "number": args.number,
+            "repeat": args.repeat,
+        },
+        "micro": run_micro(args.number, args.repeat, args.only),
+    }
+    if not args.no_macro:
+        results["macro"] = run_macro(args.repeat)
+    if not args.no_scaling:
+        results["scaling"] = run_scaling()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_table(results, baseline)
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+
+    problems = compare(results, baseline, args.threshold)
+    if problems:
+        print(f"\n{len(problems)} regression(s) over {args.threshold:.0%}:")
+        for p in problems:
+            print("  " + p)
+        return 1
+    if baseline:
+        print(f"\nno regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
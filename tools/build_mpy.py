@@ -0,0 +1,88 @@
+"""Build the CIRCUITPY drive contents with the game precompiled to .mpy
+
+    python3 tools/build_mpy.py                  # -> build/CIRCUITPY
+    python3 tools/build_mpy.py --mpy-cross ~/bin/mpy-cross-9.2.1
+    python3 tools/build_mpy.py --source         # copy .py files instead
+
+Every game module is compiled with mpy-cross so the board loads bytecode
+instead of compiling source at boot (which also needs RAM for the parser).
+code.py stays a two-line source stub, since CircuitPython only runs code.py
+as source. The drivers in Library/ are copied to lib/.
+
+Use the mpy-cross release that matches the board's CircuitPython version;
+a mismatched one produces files the board refuses to import
+("Incompatible .mpy file").
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+
+# Modules that run on the board; code.py imports claw
+DEVICE_MODULES = (
+    "claw", "hal", "hal_board", "memman", "governor", "profiler", "recorder",
+    "ui", "audio", "leds", "sensors", "scores",
+    "modes", "multiplayer", "endless", "highscores", "benchmark",
+)
+
+
+def compile_module(mpy_cross, src, dst):
+    subprocess.run([mpy_cross, "-o", dst, src], check=True)
+
+
+def copy_library(out):
+    """Library/ -> lib/, without host caches"""
+    shutil.copytree(os.path.join(REPO_DIR, "Library"), os.path.join(out, "lib"),
+                    ignore=shutil.ignore_patterns("__pycache__", "*.pyc"),
+                    dirs_exist_ok=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--out", default=os.path.join(REPO_DIR, "build", "CIRCUITPY"))
+    parser.add_argument("--mpy-cross", default="mpy-cross", help="mpy-cross executable")
+    parser.add_argument("--source", action="store_true", help="copy .py sources, do not compile")
+    args = parser.parse_args(argv)
+
+    if not args.source and shutil.which(args.mpy_cross) is None:
+        print(f"{args.mpy_cross} not found; get the release matching the board's "
+              "CircuitPython version, or use --source", file=sys.stderr)
+        return 1
+
+    if os.path.isdir(args.out):
+        shutil.rmtree(args.out)
+    os.makedirs(args.out)
+    shutil.copy(os.path.join(REPO_DIR, "code.py"), args.out)
+    copy_library(args.out)
+
+    print(f"{'module':<14}{'source B':>10}{'board B':>10}")
+    total_src = total_out = 0
+    for name in DEVICE_MODULES:
+        src = os.path.join(REPO_DIR, name + ".py")
+        if args.source:
+            dst = os.path.join(args.out, name + ".py")
+            shutil.copy(src, dst)
+        else:
+            dst = os.path.join(args.out, name + ".mpy")
+            try:
+                compile_module(args.mpy_cross, src, dst)
+            except subprocess.CalledProcessError:
+                print(f"mpy-cross failed on {name}.py", file=sys.stderr)
+                return 1
+        size_src = os.path.getsize(src)
+        size_out = os.path.getsize(dst)
+        total_src += size_src
+        total_out += size_out
+        print(f"{name:<14}{size_src:>10}{size_out:>10}")
+    print(f"{'total':<14}{total_src:>10}{total_out:>10}")
+    print(f"copy {args.out}/ to the CIRCUITPY drive")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""Reference dodger peer for the claw MULTIPLAYER mode (host side, CPython).
+
+Speaks the same UART protocol as the dodger board:
+
+    dodger -> shooter   P:<x>\\n        player position in pixels
+    shooter -> dodger   AIM:<ax>\\n     raw accelerometer x of the shooter
+    shooter -> dodger   FIRE:1\\n       claw dropped
+    shooter -> dodger   PING:<n>\\n     answered with PONG:<n> (BENCHMARK mode)
+
+By default a pseudo-terminal is created and its path printed, so anything that
+can open a serial port can act as the shooter. With --device the simulator
+attaches to an existing tty instead (e.g. a USB-UART adapter wired to D6/D7
+of a real board).
+
+Examples:
+    python3 tools/dodger_sim.py --movement sweep --rate 50
+    python3 tools/dodger_sim.py --rate 1000 --latency 0.02 --jitter 0.01 \\
+        --loss 0.05 --corrupt 0.01 --log timing.csv
+    python3 tools/dodger_sim.py --device /dev/ttyUSB0 --movement script \\
+        --script moves.txt
+"""
+
+import argparse
+import csv
+import heapq
+import math
+import os
+import random
+import select
+import sys
+import termios
+import time
+import tty
+
+# Must match ui.py, sensors.py and multiplayer.py
+SCREEN_WIDTH = 128
+CLAW_WIDTH = 40
+PLAYER_WIDTH = 8
+ACCEL_MIN = -4.0
+ACCEL_MAX = 4.0
+
+MAX_X = SCREEN_WIDTH - PLAYER_WIDTH
+
+BAUD_RATES = {
+    9600: termios.B9600,
+    19200: termios.B19200,
+    38400: termios.B38400,
+    57600: termios.B57600,
+    115200: termios.B115200,
+    230400: termios.B230400,
+}
+
+
+def map_range(x, in_min, in_max, out_min, out_max):
+    if x < in_min:
+        x = in_min
+    if x > in_max:
+        x = in_max
+    return out_min + (out_max - out_min) * (x - in_min) / (in_max - in_min)
+
+
+def claw_x_from_aim(aim):
+    """Claw position the shooter draws for a given AIM value"""
+    return int(map_range(aim, ACCEL_MIN, ACCEL_MAX, 0, SCREEN_WIDTH - CLAW_WIDTH))
+
+
+# Movement sources
+class RandomWalk:
+    def __init__(self, rng, step):
+        self.rng = rng
+        self.step = step
+        self.x = MAX_X / 2
+
+    def position(self, t):
+        self.x += self.rng.uniform(-self.step, self.step)
+        self.x = min(max(self.x, 0), MAX_X)
+        return int(self.x)
+
+
+class Sweep:
+    def __init__(self, speed):
+        self.speed = speed
+
+    def position(self, t):
+        # Triangle wave across the whole screen
+        period = 2.0 * MAX_X / self.speed
+        phase = math.fmod(t, period) / period
+        if phase < 0.5:
+            return int(MAX_X * phase * 2)
+        return int(MAX_X * (1.0 - phase) * 2)
+
+
+class Script:
+    """Positions from a file of "<t> <x>" lines (held until the next line)
+
+    Lines with a single number are taken as one position per send tick and
+    loop when they run out; timed scripts hold their last position.
+    """
+
+    def __init__(self, path):
+        self.timed = []
+        self.ticks = []
+        with open(path) as f:
+            for line in f:
+                line = line.split("#", 1)[0].split()
+                if len(line) == 2:
+                    self.timed.append((float(line[0]), int(line[1])))
+                elif len(line) == 1:
+                    self.ticks.append(int(line[0]))
+        if not self.timed and not self.ticks:
+            raise ValueError(f"{path}: no positions")
+        self.timed.sort()
+        self.tick = 0
+
+    def position(self, t):
+        if self.ticks:
+            x = self.ticks[self.tick % len(self.ticks)]
+            self.tick += 1
+            return x
+        x = self.timed[0][1]
+        for ts, xs in self.timed:
+            if ts > t:
+                break
+            x = xs
+        return x
+
+
+# Link impairments
+class Link:
+    """Delays, drops and corrupts outgoing lines before they hit the wire"""
+
+    def __init__(self, rng, latency, jitter, loss, corrupt):
+        self.rng = rng
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.corrupt = corrupt
+        self.queue = []
+        self.seq = 0
+        self.last_due = 0.0
+
+    def submit(self, now, data, meta):
+        """Queue data for delivery; returns False if the packet was lost"""
+        if self.loss and self.rng.random() < self.loss:
+            return False
+        if self.corrupt and self.rng.random() < self.corrupt:
+            data = self._garble(data)
+            meta = dict(meta, corrupted=True)
+        due = now + self.latency
+        if self.jitter:
+            due += self.rng.uniform(0, self.jitter)
+        # A UART does not reorder bytes
+        due = max(due, self.last_due)
+        self.last_due = due
+        heapq.heappush(self.queue, (due, self.seq, data, meta))
+        self.seq += 1
+        return True
+
+    def _garble(self, data):
+        body = bytearray(data.rstrip(b"\n"))
+        if not body:
+            return data
+        kind = self.rng.random()
+        i = self.rng.randrange(len(body))
+        if kind < 0.5:
+            body[i] ^= 1 << self.rng.randrange(8)
+        elif kind < 0.8:
+            del body[i:]
+        else:
+            body.insert(i, self.rng.randrange(256))
+        return bytes(body) + b"\n"
+
+    def next_due(self):
+        return self.queue[0][0] if self.queue else None
+
+    def pop_due(self, now):
+        while self.queue and self.queue[0][0] <= now:
+            due, _, data, meta = heapq.heappop(self.queue)
+            yield due, data, meta
+
+
+# Serial endpoint
+def open_pty():
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    # Keep our copy of the slave open so the master never sees EIO while the
+    # shooter side reconnects.
+    return master, slave, os.ttyname(slave)
+
+
+def open_device(path, baud):
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+    tty.setraw(fd)
+    attrs = termios.tcgetattr(fd)
+    speed = BAUD_RATES[baud]
+    attrs[4] = speed
+    attrs[5] = speed
+    termios.tcsetattr(fd, termios.TCSANOW, attrs)
+    return fd
+
+
+class Stats:
+    def __init__(self):
+        self.sent = 0
+        self.lost = 0
+        self.corrupted = 0
+        self.delivered = 0
+        self.link_delay = []
+        self.aim_count = 0
+        self.aim_gaps = []
+        self.last_aim_t = None
+        self.last_aim = 0.0
+        self.fires = 0
+        self.fire_hits = 0
+        self.fire_age = []
+        self.bad_lines = 0
+        self.pings = 0
+
+    @staticmethod
+    def _summary(values, scale=1000.0):
+        if not values:
+            return "n=0"
+        s = sorted(values)
+        p99 = s[min(len(s) - 1, int(len(s) * 0.99))]
+        avg = sum(s) / len(s)
+        return (f"n={len(s)} min={s[0] * scale:.2f} avg={avg * scale:.2f} "
+                f"p99={p99 * scale:.2f} max={s[-1] * scale:.2f} ms")
+
+    def report(self, elapsed, out=sys.stderr):
+        print(f"--- dodger sim: {elapsed:.1f}s ---", file=out)
+        print(f"P sent {self.sent}  delivered {self.delivered}  lost {self.lost}  "
+              f"corrupted {self.corrupted}  ({self.sent / max(elapsed, 1e-9):.0f}/s)", file=out)
+        print(f"link delay   {self._summary(self.link_delay)}", file=out)
+        print(f"AIM received {self.aim_count}  gap {self._summary(self.aim_gaps)}", file=out)
+        print(f"FIRE received {self.fires}  predicted hits {self.fire_hits}", file=out)
+        print(f"pos age @FIRE {self._summary(self.fire_age)}", file=out)
+        print(f"PING answered {self.pings}", file=out)
+        print(f"unparsed lines {self.bad_lines}", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--device", help="use an existing tty instead of a new pty")
+    parser.add_argument("--baud", type=int, default=115200, choices=sorted(BAUD_RATES))
+    parser.add_argument("--movement", choices=("random", "sweep", "script"), default="random")
+    parser.add_argument("--script", help="position script for --movement script")
+    parser.add_argument("--step", type=float, default=3.0, help="random walk step (px)")
+    parser.add_argument("--speed", type=float, default=60.0, help="sweep speed (px/s)")
+    parser.add_argument("--rate", type=float, default=30.0, help="P: messages per second")
+    parser.add_argument("--latency", type=float, default=0.0, help="added one-way delay (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay, 0..N (s)")
+    parser.add_argument("--loss", type=float, default=0.0, help="drop probability per line")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="corruption probability per line")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--duration", type=float, default=0.0, help="stop after N seconds (0 = run forever)")
+    parser.add_argument("--log", help="CSV timing log")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    if args.movement == "script":
+        if not args.script:
+            parser.error("--movement script needs --script")
+        mover = Script(args.script)
+    elif args.movement == "sweep":
+        mover = Sweep(args.speed)
+    else:
+        mover = RandomWalk(rng, args.step)
+    link = Link(rng, args.latency, args.jitter, args.loss, args.corrupt)
+
+    keep = None
+    if args.device:
+        fd = open_device(args.device, args.baud)
+        print(f"dodger sim attached to {args.device} @ {args.baud}", file=sys.stderr)
+    else:
+        fd, keep, name = open_pty()
+        os.set_blocking(fd, False)
+        print(f"dodger sim listening on {name}", file=sys.stderr)
+        # The path alone on stdout so scripts can capture it
+        print(name, flush=True)
+
+    log_file = open(args.log, "w", newline="") if args.log else None
+    log = csv.writer(log_file) if log_file else None
+    if log:
+        log.writerow(["t", "dir", "event", "value", "detail"])
+
+    stats = Stats()
+    period = 1.0 / args.rate if args.rate > 0 else None
+    start = time.monotonic()
+    next_send = start
+    rx_buf = b""
+    pos = None          # last position generated
+    delivered = None    # (x, generated_at) last position that reached the wire
+
+    try:
+        while True:
+            now = time.monotonic()
+            t = now - start
+            if args.duration and t >= args.duration:
+                break
+
+            # Generate positions at the configured rate
+            if period is not None and now >= next_send:
+                pos = mover.position(t)
+                line = f"P:{pos}\n".encode()
+                stats.sent += 1
+                if not link.submit(now, line, {"x": pos, "gen": now}):
+                    stats.lost += 1
+                    if log:
+                        log.writerow([f"{t:.6f}", "tx", "lost", pos, ""])
+                next_send += period
+                # Do not try to catch up after a long stall
+                if next_send < now:
+                    next_send = now + period
+
+            # Put due lines on the wire
+            for due, data, meta in link.pop_due(now):
+                try:
+                    os.write(fd, data)
+                except BlockingIOError:
+                    # Nobody is draining the pty; the line is gone
+                    stats.lost += 1
+                    continue
+                delay = now - meta["gen"]
+                if "pong" in meta:
+                    if log:
+                        log.writerow([f"{now - start:.6f}", "tx", "PONG", meta["pong"],
+                                      f"delay={delay * 1000:.3f}ms"])
+                    continue
+                stats.delivered += 1
+                stats.link_delay.append(delay)
+                if meta.get("corrupted"):
+                    stats.corrupted += 1
+                else:
+                    delivered = (meta["x"], meta["gen"])
+                if log:
+                    log.writerow([f"{now - start:.6f}", "tx", "P", meta["x"],
+                                  f"delay={delay * 1000:.3f}ms" + (" corrupted" if meta.get("corrupted") else "")])
+
+            # Wait for input or the next deadline
+            deadlines = [d for d in (next_send if period else None, link.next_due()) if d is not None]
+            timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else 0.1
+            if args.duration:
+                timeout = min(timeout, max(0.0, start + args.duration - time.monotonic()))
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                continue
+            try:
+                chunk = os.read(fd, 4096)
+            except (BlockingIOError, OSError):
+                chunk = b""
+            if not chunk:
+                continue
+            rx_buf += chunk
+            now = time.monotonic()
+            while b"\n" in rx_buf:
+                raw, rx_buf = rx_buf.split(b"\n", 1)
+                msg = raw.decode(errors="replace").strip()
+                if msg.startswith("AIM:"):
+                    try:
+                        stats.last_aim = float(msg[4:])
+                    except ValueError:
+                        stats.bad_lines += 1
+                        continue
+                    stats.aim_count += 1
+                    if stats.last_aim_t is not None:
+                        stats.aim_gaps.append(now - stats.last_aim_t)
+                    stats.last_aim_t = now
+                    if log:
+                        log.writerow([f"{now - start:.6f}", "rx", "AIM", stats.last_aim, ""])
+                elif msg.startswith("FIRE:"):
+                    stats.fires += 1
+                    claw_left = claw_x_from_aim(stats.last_aim)
+                    detail = "no position delivered"
+                    if delivered is not None:
+                        x, gen = delivered
+                        age = now - gen
+                        stats.fire_age.append(age)
+                        center = x + PLAYER_WIDTH // 2
+                        hit = claw_left <= center <= claw_left + CLAW_WIDTH
+                        stats.fire_hits += hit
+                        detail = f"claw={claw_left} pos={x} age={age * 1000:.3f}ms {'HIT' if hit else 'MISS'}"
+                    if log:
+                        log.writerow([f"{now - start:.6f}", "rx", "FIRE", pos, detail])
+                    if not args.quiet:
+                        print(f"[{now - start:8.3f}] FIRE {detail}", file=sys.stderr)
+                elif msg.startswith("PING:"):
+                    # Goes through the same impaired link as positions
+                    stats.pings += 1
+                    link.submit(now, f"PONG:{msg[5:]}\n".encode(), {"pong": msg[5:], "gen": now})
+                    if log:
+                        log.writerow([f"{now - start:.6f}", "rx", "PING", msg[5:], ""])
+                elif msg:
+                    stats.bad_lines += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats.report(time.monotonic() - start)
+        if log_file:
+            log_file.close()
+        os.close(fd)
+        if keep is not None:
+            os.close(keep)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Run claw.py headless on the simulated HAL, faster than real time
+
+An autopilot tilts the simulated accelerometer towards the nearest target and
+presses the button when the claw is over it. With the same seed a run is
+fully deterministic.
+
+Examples:
+    python3 tools/headless.py --mode HARD --seed 3
+    python3 tools/headless.py --mode MULTIPLAYER --duration 130 --json
+    python3 tools/headless.py --mode MULTIPLAYER --realtime --uart /dev/pts/3
+    python3 tools/headless.py --mode SCORES --nvm scores.nvm --screen
+    python3 tools/headless.py --mode EASY --linger 60   # then idle on GAME OVER
+    python3 tools/headless.py --mode EASY --warm --record easy.rec --check
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import random
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TOOLS_DIR)
+for path in (TOOLS_DIR, REPO_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import hal  # noqa: E402
+import sim_hal  # noqa: E402
+
+MODES = ("EASY", "MEDIUM", "HARD", "MULTIPLAYER", "ENDLESS")
+# Device modules that hold per-board state; reloaded for every game
+GAME_MODULES = ("claw", "memman", "governor", "ui", "audio", "leds", "sensors", "scores",
+                "modes", "multiplayer", "endless", "highscores", "benchmark")
+# Menu entries that are screens rather than games
+SCREENS = ("SCORES", "BENCHMARK")
+
+
+def load_game(sim, seed):
+    """Import a fresh copy of claw.py wired to `sim`"""
+    hal.use(sim)
+    random.seed(seed)
+    for name in GAME_MODULES:
+        sys.modules.pop(name, None)
+    # Keep stdout clean for --json; boot messages go to stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        import claw
+    return claw
+
+
+def mode_available(mode):
+    """ENDLESS needs numpy on the host (ulab.numpy on the board)"""
+    return mode != "ENDLESS" or importlib.util.find_spec("numpy") is not None
+
+
+class Autopilot:
+    """Aims at the nearest target; `skill` is the chance to wait for a good shot
+
+    The chance is per 15 ms of game time, so the autopilot plays the same at
+    any loop rate.
+    """
+
+    def __init__(self, game, sim, rng, skill=0.9):
+        self.game = game
+        self.sim = sim
+        self.rng = rng
+        self.skill = skill
+        self.last = None
+        self.frames = 1.0
+        self.presses = 0
+
+    def target_center(self):
+        g = self.game
+        m = g.active
+        ui = g.ui
+        claw_center = ui.claw_line1.x + ui.CLAW_WIDTH / 2
+        if g.game_mode == "EASY":
+            return m.ball_x + m.BALL_WIDTH // 4
+        if g.game_mode == "MEDIUM":
+            balls = m.medium_balls
+            if not balls:
+                return None
+            return min((b["x"] + m.BALL_WIDTH // 2 for b in balls), key=lambda c: abs(c - claw_center))
+        if g.game_mode == "HARD":
+            if not m.hard_balls:
+                return None
+            # Lead the target by the time the claw takes to come down
+            lead = ui.DROP_STEPS + 1
+            centers = []
+            for b in m.hard_balls:
+                x = min(max(b["x"] + b["vx"] * lead, 0), ui.SCREEN_WIDTH - m.BALL_WIDTH)
+                centers.append(x + m.BALL_WIDTH / 2)
+            return min(centers, key=lambda c: abs(c - claw_center))
+        if g.game_mode == "MULTIPLAYER":
+            return m.player_x + m.PLAYER_WIDTH // 2
+        if g.game_mode == "ENDLESS":
+            # Centre of the claw-wide window holding the most targets after the drop
+            np = m.np
+            xs = np.clip(m.xs + m.vxs * (ui.DROP_STEPS + 1), 0, m.MAX_X)
+            xs.sort()
+            inside = np.searchsorted(xs, xs + ui.CLAW_WIDTH, side="right") - np.arange(len(xs))
+            return float(xs[inside.argmax()]) + ui.CLAW_WIDTH / 2
+        return None
+
+    def step(self):
+        g = self.game
+        # Game time since the last step in 15 ms frames, at most one (a drop)
+        now = self.sim.clock.monotonic()
+        if self.last is not None:
+            self.frames = min((now - self.last) / g.governor.FRAME_TIME, 1.0)
+        self.last = now
+        if g.in_menu or g.active.game_state != "PLAYING":
+            return
+        target = self.target_center()
+        if target is None:
+            return
+        ui = g.ui
+        sensors = g.sensors
+        span = ui.SCREEN_WIDTH - ui.CLAW_WIDTH
+        want_x = min(max(target - ui.CLAW_WIDTH / 2, 0), span)
+        accel = sensors.ACCEL_MIN + (sensors.ACCEL_MAX - sensors.ACCEL_MIN) * want_x / span
+        if g.game_mode != "MULTIPLAYER":
+            accel += sensors.offset_x
+        self.sim.accelerometer.value = accel
+
+        # The game only sees a press after it has seen the button released
+        if self.sim.inputs.pressing() or not g.last_btn_state:
+            return
+        claw_center = ui.claw_line1.x + ui.CLAW_WIDTH / 2
+        aligned = abs(claw_center - target) < ui.CLAW_WIDTH / 4
+        if aligned or self.rng.random() < (1 - self.skill) * self.frames:
+            self.sim.inputs.press()
+            self.presses += 1
+
+
+def state_digest(game):
+    """Small tuple describing the frame, for determinism checks"""
+    return (
+        round(game.hw.clock.monotonic(), 6), game.active.game_state,
+        game.ui.claw_line1.x, tuple(game.active.digest_values()),
+    )
+
+
+def run_game(mode, seed=0, frames=None, duration=None, skill=0.9, realtime=False,
+             uart="peer", trace=False, sim=None, profile=False, record=None, nvm=None,
+             linger=None, warm=False):
+    """Play one game of `mode` and return a result dict
+
+    linger: keep the loop running for that many simulated seconds after the
+    game ends, without input, so the end screen goes IDLE (see governor.py).
+    warm: load the mode's module first, as an earlier game in the same boot
+    would have.
+    """
+    if not mode_available(mode):
+        raise SystemExit(f"{mode} needs numpy on the host")
+    sim = sim or sim_hal.SimHAL(seed=seed, realtime=realtime, uart=uart, nvm=nvm)
+    game = load_game(sim, seed)
+    pilot = Autopilot(game, sim, random.Random(seed + 1), skill)
+    if profile:
+        # Host CPU time per phase; the virtual clock would report zeros
+        game.prof.clock = time
+        game.prof.toggle()
+
+    # Loading a mode module prints boot-style messages too
+    with contextlib.redirect_stdout(sys.stderr):
+        if warm:
+            game.load(mode)
+        if mode in SCREENS:
+            game.in_menu = False
+            game.start_mode(mode)
+        else:
+            game.RECORD_PATH = record
+            game.start_game(mode)
+
+    digests = []
+    count = 0
+    t0 = sim.clock.monotonic()
+    wall0 = time.perf_counter()
+    # A game back in the menu prints report lines; keep them out of --json
+    # (PROF lines from --profile belong on stdout)
+    out = contextlib.nullcontext() if profile else contextlib.redirect_stdout(sys.stderr)
+    with out:
+        while game.active.game_state == "PLAYING":
+            if frames is not None and count >= frames:
+                break
+            if duration is not None and sim.clock.monotonic() - t0 >= duration:
+                break
+            pilot.step()
+            game.loop_once()
+            count += 1
+            if trace:
+                digests.append(state_digest(game))
+        if linger:
+            t_end = sim.clock.monotonic() + linger
+            while sim.clock.monotonic() < t_end and not game.in_menu:
+                game.loop_once()
+                count += 1
+                if trace:
+                    digests.append(state_digest(game))
+    wall = time.perf_counter() - wall0
+    if profile:
+        game.prof.dump()
+    recorded = game.input_tap
+    with contextlib.redirect_stdout(sys.stderr):
+        game.stop_tap()
+    sim_time = sim.clock.monotonic() - t0
+    m = game.active
+
+    result = {
+        "mode": mode,
+        "seed": seed,
+        "frames": count,
+        "sim_seconds": round(sim_time, 3),
+        "wall_seconds": round(wall, 6),
+        "speedup": round(sim_time / wall, 1) if wall else None,
+        "fps": round(count / wall, 1) if wall else None,
+        "state": m.game_state,
+        "level": getattr(m, "current_level_index", 0) + 1,
+        "hits_remaining": getattr(m, "hits_remaining", None),
+        "lives": getattr(m, "lives", None),
+        "presses": pilot.presses,
+        "mp_score": [getattr(m, "mp_score_shooter", 0), getattr(m, "mp_score_dodger", 0)],
+        "buzzer_events": sum(1 for e in sim.events if e[1] == "buzzer"),
+        "led_events": sum(1 for e in sim.events if e[1] == "led"),
+        "digest": game.state_digest(),
+        "scores_commit_us": game.scores.store.max_us,
+        "nvm_writes": sim.nvm.writes,
+        "light_sleeps": sim.light_sleeps,
+        "governor": {state: [frames, round(duty, 3), round(light, 3), round(ma, 1)]
+                     for state, (frames, duty, light, ma) in game.gov.summary().items()},
+    }
+    if recorded is not None:
+        result["recorded_bytes"] = recorded.bytes
+    if trace:
+        result["trace"] = digests
+    return result, game, sim
+
+
+def replay_game(path, seed=0, realtime=False):
+    """Replay a recording on a fresh simulated board at full speed"""
+    sim = sim_hal.SimHAL(seed=seed, realtime=realtime, uart=None)
+    game = load_game(sim, seed)
+    # replay() returns to the menu at the end; capture the final frame state
+    digests = []
+    show_menu = game.show_menu
+
+    def capture_then_menu():
+        digests.append(game.state_digest())
+        show_menu()
+    game.show_menu = capture_then_menu
+    wall0 = time.perf_counter()
+    tap = game.replay(path, realtime=realtime)
+    wall = time.perf_counter() - wall0
+    return {
+        "replay": path,
+        "mode": game.MENU_OPTIONS[tap.mode_index],
+        "frames": tap.frames,
+        "wall_seconds": round(wall, 6),
+        "fps": round(tap.frames / wall, 1) if wall else None,
+        "first_mismatch": tap.mismatch,
+        "desync": tap.desync,
+        "digest": digests[-1] if digests else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--mode", choices=MODES + SCREENS, default="HARD")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, help="stop after N main-loop iterations")
+    parser.add_argument("--duration", type=float, help="stop after N simulated seconds")
+    parser.add_argument("--skill", type=float, default=0.9)
+    parser.add_argument("--realtime", action="store_true", help="pace the clock against the wall clock")
+    parser.add_argument("--uart", default="peer",
+                        help='"peer" (built-in dodger), "none", or a tty path such as a dodger_sim pty')
+    parser.add_argument("--check", action="store_true", help="run twice and verify identical frame states; with --record, also replay the recording")
+    parser.add_argument("--profile", action="store_true",
+                        help="print PROF lines with host timings (see parse_profile.py)")
+    parser.add_argument("--screen", action="store_true", help="print the final screen")
+    parser.add_argument("--record", help="record the session's inputs to this file")
+    parser.add_argument("--replay", help="replay a recording instead of playing")
+    parser.add_argument("--linger", type=float,
+                        help="after the game ends, idle on the end screen for N simulated seconds")
+    parser.add_argument("--warm", action="store_true",
+                        help="load the mode's module before the game, as a second game in a boot would")
+    parser.add_argument("--nvm", help="file backing the simulated NVM, kept between runs")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with contextlib.redirect_stdout(sys.stderr):
+            result = replay_game(args.replay, args.seed, args.realtime)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            for key, value in result.items():
+                print(f"{key:>15}: {value}")
+        return 0 if result["first_mismatch"] is None and result["desync"] is None else 1
+
+    uart = None if args.uart == "none" else args.uart
+    result, game, sim = run_game(args.mode, args.seed, args.frames, args.duration,
+                                 args.skill, args.realtime, uart, trace=args.check,
+                                 profile=args.profile, record=args.record, nvm=args.nvm,
+                                 linger=args.linger, warm=args.warm)
+    if args.check:
+        # A recorded game runs on quantised inputs, so record the second run too
+        again_record = args.record + ".again" if args.record else None
+        again, _, _ = run_game(args.mode, args.seed, args.frames, args.duration,
+                               args.skill, args.realtime, uart, trace=True, linger=args.linger,
+                               record=again_record, warm=args.warm)
+        if again_record:
+            os.remove(again_record)
+        same = result.pop("trace") == again.pop("trace")
+        if args.record:
+            # The recording must replay on a fresh (cold) board
+            with contextlib.redirect_stdout(sys.stderr):
+                replayed = replay_game(args.record, args.seed)
+            result["replays"] = replayed["first_mismatch"] is None and replayed["desync"] is None
+        result["deterministic"] = same
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        for key, value in result.items():
+            print(f"{key:>15}: {value}")
+    if args.screen:
+        print(sim.display.ascii())
+    if args.check and not (result["deterministic"] and result.get("replays", True)):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Turn PROF lines from the serial console into a table
+
+    python3 tools/parse_profile.py console.log
+    tio /dev/ttyACM0 | python3 tools/parse_profile.py --follow
+    python3 tools/parse_profile.py --device /dev/ttyACM0
+
+By default the dumps are combined: min of mins, frame-weighted mean of the
+averages and worst p99. --each prints every dump instead.
+"""
+
+import argparse
+import sys
+
+
+def parse_line(line):
+    """Return {"n":, "free":, "phases": {name: (min, avg, p99)}} or None"""
+    start = line.find("PROF n=")
+    if start < 0:
+        return None
+    dump = {"n": 0, "free": -1, "phases": {}}
+    for field in line[start + 5:].split():
+        if "=" not in field:
+            continue
+        key, value = field.split("=", 1)
+        try:
+            if key in ("n", "free"):
+                dump[key] = int(value)
+            else:
+                lo, avg, p99 = (int(v) for v in value.split("/"))
+                dump["phases"][key] = (lo, avg, p99)
+        except ValueError:
+            return None
+    return dump if dump["phases"] else None
+
+
+def combine(dumps):
+    frames = sum(d["n"] for d in dumps)
+    phases = {}
+    for d in dumps:
+        for name, (lo, avg, p99) in d["phases"].items():
+            p = phases.setdefault(name, [lo, 0, p99])
+            p[0] = min(p[0], lo)
+            p[1] += avg * d["n"]
+            p[2] = max(p[2], p99)
+    for p in phases.values():
+        p[1] = p[1] / frames if frames else 0
+    return {
+        "n": frames,
+        "free": min(d["free"] for d in dumps),
+        "phases": {k: tuple(v) for k, v in phases.items()},
+    }
+
+
+def print_table(dump, title, out=sys.stdout):
+    phases = dump["phases"]
+    total_avg = phases.get("total", (0, 0, 0))[1] or 1
+    print(f"{title}: {dump['n']} frames, gc.mem_free {dump['free']} B", file=out)
+    print(f"  {'phase':<9}{'min us':>9}{'avg us':>10}{'p99 us':>9}{'share':>8}", file=out)
+    for name, (lo, avg, p99) in phases.items():
+        if name == "total":
+            continue
+        print(f"  {name:<9}{lo:>9}{avg:>10.0f}{p99:>9}{avg / total_avg:>8.0%}", file=out)
+    if "total" in phases:
+        lo, avg, p99 = phases["total"]
+        print(f"  {'total':<9}{lo:>9}{avg:>10.0f}{p99:>9}   {1e6 / avg if avg else 0:.1f} fps", file=out)
+
+
+def read_device(path):
+    import os
+    import tty
+    fd = os.open(path, os.O_RDWR | os.O_NOCTTY)
+    tty.setraw(fd)
+    with os.fdopen(fd, "rb", buffering=0) as f:
+        buf = b""
+        while True:
+            chunk = f.read(256)
+            if not chunk:
+                break
+            buf += chunk
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                yield line.decode(errors="replace")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("log", nargs="?", help="console log (default stdin)")
+    parser.add_argument("--device", help="read a serial port directly")
+    parser.add_argument("--each", action="store_true", help="one table per dump")
+    parser.add_argument("--follow", action="store_true", help="print a table as each dump arrives")
+    args = parser.parse_args(argv)
+
+    if args.device:
+        lines = read_device(args.device)
+    elif args.log:
+        lines = open(args.log, errors="replace")
+    else:
+        lines = sys.stdin
+
+    dumps = []
+    try:
+        for line in lines:
+            dump = parse_line(line)
+            if dump is None:
+                continue
+            dumps.append(dump)
+            if args.each or args.follow:
+                print_table(dump, f"dump {len(dumps)}")
+                print()
+    except KeyboardInterrupt:
+        pass
+
+    if not dumps:
+        print("no PROF lines found", file=sys.stderr)
+        return 1
+    if not args.each:
+        print_table(combine(dumps), f"{len(dumps)} dumps")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,485 @@
+"""Simulated hal.py backend for running claw.py under CPython
+
+Everything runs off a virtual clock, so sleeps cost nothing and a game plays
+as fast as the host can execute the logic. Inputs are scripted; outputs
+(buzzer, LEDs, UART writes) are captured in SimHAL.events.
+
+    sim = SimHAL(seed=1)
+    hal.use(sim)
+    import claw
+"""
+
+import os
+import random
+import time
+
+from dodger_sim import RandomWalk
+
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 64
+NUM_LEDS = 3
+NVM_SIZE = 8192
+GLYPH_W = 6
+GLYPH_H = 12
+
+
+class VirtualClock:
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def monotonic(self):
+        return self.t
+
+    def monotonic_ns(self):
+        return int(self.t * 1e9)
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.t += seconds
+
+
+class RealClock:
+    """Wall-clock pacing, for talking to real-time peers such as dodger_sim"""
+
+    def __init__(self):
+        self.start = time.monotonic()
+
+    @property
+    def t(self):
+        return time.monotonic() - self.start
+
+    def monotonic(self):
+        return time.monotonic() - self.start
+
+    def monotonic_ns(self):
+        return time.monotonic_ns() - int(self.start * 1e9)
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+# displayio / adafruit_display_text stand-ins
+class Font:
+    def get_bounding_box(self):
+        return (GLYPH_W, GLYPH_H)
+
+
+FONT = Font()
+
+
+class Group(list):
+    def __init__(self, x=0, y=0, scale=1):
+        super().__init__()
+        self.x = x
+        self.y = y
+        self.scale = scale
+        self.hidden = False
+
+    def remove(self, item):
+        # displayio compares by identity, list.remove by equality
+        for i, obj in enumerate(self):
+            if obj is item:
+                del self[i]
+                return
+        raise ValueError("object not in group")
+
+    def __contains__(self, item):
+        return any(obj is item for obj in self)
+
+
+class Label:
+    def __init__(self, font, text="", color=0xFFFFFF, x=0, y=0, **kwargs):
+        self.font = font
+        self.text = text
+        self.color = color
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self.anchor_point = None
+        self.anchored_position = None
+
+    def __eq__(self, other):
+        return self is other
+
+    __hash__ = object.__hash__
+
+    def bounds(self):
+        """(left, top, width, height) in screen pixels"""
+        lines = self.text.split("\n")
+        w = max(len(line) for line in lines) * GLYPH_W
+        h = len(lines) * GLYPH_H
+        if self.anchor_point is not None and self.anchored_position is not None:
+            left = self.anchored_position[0] - self.anchor_point[0] * w
+            top = self.anchored_position[1] - self.anchor_point[1] * h
+        else:
+            # Label y is the vertical centre of the first line
+            left = self.x
+            top = self.y - h // 2
+        return int(left), int(top), w, h
+
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.data = bytearray(width * height)
+
+    # int(): host numpy scalars would overflow in uint8 arithmetic
+    def __getitem__(self, xy):
+        x, y = xy
+        return self.data[int(y) * self.width + int(x)]
+
+    def __setitem__(self, xy, value):
+        x, y = xy
+        self.data[int(y) * self.width + int(x)] = value
+
+    def fill(self, value):
+        self.data[:] = bytes([value]) * len(self.data)
+
+
+class Palette(list):
+    def __init__(self, color_count):
+        super().__init__([0] * color_count)
+
+
+class TileGrid:
+    def __init__(self, bitmap, pixel_shader=None, x=0, y=0, **kwargs):
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.x = x
+        self.y = y
+        self.hidden = False
+
+
+class Display:
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.width = width
+        self.height = height
+        self.root_group = None
+        self.auto_refresh = True
+        self.refreshes = 0
+        self.framebuffer = bytearray(width * height)
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        self.refreshes += 1
+        return True
+
+    def render(self):
+        """Rasterise the current group into the framebuffer (block glyphs)"""
+        fb = self.framebuffer
+        for i in range(len(fb)):
+            fb[i] = 0
+        if self.root_group is not None:
+            self._draw(self.root_group, 0, 0)
+        return fb
+
+    def _draw(self, group, ox, oy):
+        if getattr(group, "hidden", False):
+            return
+        ox += getattr(group, "x", 0)
+        oy += getattr(group, "y", 0)
+        for item in group:
+            if getattr(item, "hidden", False):
+                continue
+            if isinstance(item, Group):
+                self._draw(item, ox, oy)
+            elif isinstance(item, TileGrid):
+                bmp = item.bitmap
+                for y in range(bmp.height):
+                    for x in range(bmp.width):
+                        if bmp.data[y * bmp.width + x]:
+                            self._fill(ox + item.x + x, oy + item.y + y, 1, 1)
+            elif isinstance(item, Label):
+                left, top, _, _ = item.bounds()
+                for row, line in enumerate(item.text.split("\n")):
+                    for n, ch in enumerate(line):
+                        if ch != " ":
+                            self._fill(ox + left + n * GLYPH_W + 1, oy + top + row * GLYPH_H + 2,
+                                       GLYPH_W - 2, GLYPH_H - 4)
+
+    def _fill(self, x, y, w, h):
+        for yy in range(max(y, 0), min(y + h, self.height)):
+            row = yy * self.width
+            for xx in range(max(x, 0), min(x + w, self.width)):
+                self.framebuffer[row + xx] = 1
+
+    def ascii(self):
+        """Framebuffer as text, one character per 2x2 pixel block"""
+        fb = self.render()
+        lines = []
+        for y in range(0, self.height, 2):
+            line = []
+            for x in range(0, self.width, 2):
+                on = (fb[y * self.width + x] or fb[y * self.width + x + 1]
+                      or fb[(y + 1) * self.width + x] or fb[(y + 1) * self.width + x + 1])
+                line.append("#" if on else ".")
+            lines.append("".join(line))
+        return "\n".join(lines)
+
+
+# Inputs
+class Inputs:
+    """Scripted button presses and encoder steps, timed on the sim clock"""
+
+    PRESS_HOLD = 0.05
+    STEP_HOLD = 0.03
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.btn_windows = []   # (start, end)
+        self.enc_windows = []   # (start, end, b_level)
+
+    def press(self, at=None, hold=PRESS_HOLD):
+        start = self.clock.t if at is None else at
+        self.btn_windows.append((start, start + hold))
+
+    def pressing(self):
+        t = self.clock.t
+        return any(end > t for _, end in self.btn_windows)
+
+    def turn(self, steps, at=None, gap=0.08):
+        """Rotate the encoder; positive steps move the menu forward"""
+        start = self.clock.t if at is None else at
+        b_level = steps > 0
+        for i in range(abs(steps)):
+            s = start + i * gap
+            self.enc_windows.append((s, s + self.STEP_HOLD, b_level))
+
+    def _active(self, windows):
+        t = self.clock.t
+        # Drop windows that are over
+        while windows and windows[0][1] <= t:
+            windows.pop(0)
+        for w in windows:
+            if w[0] <= t < w[1]:
+                return w
+        return None
+
+    def btn_value(self):
+        return self._active(self.btn_windows) is None
+
+    def a_value(self):
+        return self._active(self.enc_windows) is None
+
+    def b_value(self):
+        w = self._active(self.enc_windows)
+        return True if w is None else w[2]
+
+
+class Pin:
+    def __init__(self, read):
+        self._read = read
+
+    @property
+    def value(self):
+        return self._read()
+
+
+class Accelerometer:
+    """x follows `value` (or `source(t)` if set) plus Gaussian noise"""
+
+    def __init__(self, clock, rng, noise=0.02):
+        self.clock = clock
+        self.rng = rng
+        self.noise = noise
+        self.value = 0.0
+        self.source = None
+        self.reads = 0
+
+    @property
+    def acceleration(self):
+        self.reads += 1
+        x = self.source(self.clock.t) if self.source else self.value
+        if self.noise:
+            x += self.rng.gauss(0.0, self.noise)
+        return (x, 0.0, 9.81)
+
+
+# Outputs
+class Buzzer:
+    def __init__(self, hal):
+        self._hal = hal
+        self._frequency = 2000
+        self._duty = 0
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        self._frequency = value
+
+    @property
+    def duty_cycle(self):
+        return self._duty
+
+    @duty_cycle.setter
+    def duty_cycle(self, value):
+        self._duty = value
+        self._hal.log("buzzer", self._frequency if value else 0)
+
+
+class Pixels:
+    def __init__(self, hal, n=NUM_LEDS):
+        self._hal = hal
+        self._px = [(0, 0, 0)] * n
+
+    def __len__(self):
+        return len(self._px)
+
+    def __getitem__(self, i):
+        return self._px[i]
+
+    def __setitem__(self, i, color):
+        color = tuple(color)
+        if self._px[i] != color:
+            self._px[i] = color
+            self._hal.log("led", (i, color))
+
+    def fill(self, color):
+        for i in range(len(self._px)):
+            self[i] = color
+
+    def show(self):
+        pass
+
+
+# UARTs
+class PeerUART:
+    """In-process dodger: P:<x> lines at `rate` per virtual second
+
+    PING:<n> is answered with PONG:<n> like tools/dodger_sim.py.
+    """
+
+    def __init__(self, hal, rng, rate=30.0, mover=None):
+        self._hal = hal
+        self.rate = rate
+        self.mover = mover if mover is not None else RandomWalk(rng, 3.0)
+        self.next_send = 0.0
+        self.rx = []
+        self.written = []
+
+    def readline(self):
+        t = self._hal.clock.t
+        while self.rate and self.next_send <= t:
+            self.rx.append(f"P:{self.mover.position(self.next_send)}\n".encode())
+            self.next_send += 1.0 / self.rate
+        if self.rx:
+            return self.rx.pop(0)
+        return None
+
+    def write(self, data):
+        data = bytes(data)
+        self.written.append(data)
+        self._hal.log("uart", data)
+        if data.startswith(b"PING:"):
+            self.rx.append(b"PONG:" + data[5:])
+        return len(data)
+
+
+class SerialUART:
+    """Non-blocking line reader over a tty, e.g. the pty of tools/dodger_sim.py"""
+
+    def __init__(self, path):
+        import os
+        import tty
+        self._os = os
+        self.fd = os.open(path, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        tty.setraw(self.fd)
+        self.buf = b""
+
+    def readline(self):
+        if b"\n" not in self.buf:
+            try:
+                self.buf += self._os.read(self.fd, 4096)
+            except (BlockingIOError, OSError):
+                pass
+        if b"\n" not in self.buf:
+            return None
+        line, self.buf = self.buf.split(b"\n", 1)
+        return line + b"\n"
+
+    def write(self, data):
+        try:
+            return self._os.write(self.fd, data)
+        except BlockingIOError:
+            return 0
+
+
+# Non-volatile memory
+class NVM(bytearray):
+    """microcontroller.nvm stand-in, erased to 0xFF; with `path` it persists"""
+
+    def __init__(self, size=NVM_SIZE, path=None):
+        super().__init__(b"\xff" * size)
+        self.path = path
+        self.writes = 0
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read(size)
+            super().__setitem__(slice(0, len(data)), data)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.writes += 1
+        if self.path:
+            with open(self.path, "wb") as f:
+                f.write(self)
+
+
+class SimHAL:
+    def __init__(self, seed=0, realtime=False, uart="peer", peer_rate=30.0,
+                 accel_noise=0.02, max_events=100000, nvm=None):
+        self.rng = random.Random(seed)
+        self.clock = RealClock() if realtime else VirtualClock()
+        self.Group = Group
+        self.Bitmap = Bitmap
+        self.Palette = Palette
+        self.TileGrid = TileGrid
+        self.Label = Label
+        self.FONT = FONT
+        self.events = []
+        self.max_events = max_events
+        self.console = []       # keys "typed" on the serial console
+        self.light_sleeps = 0
+
+        self.display = Display()
+        self.accelerometer = Accelerometer(self.clock, self.rng, accel_noise)
+        self.inputs = Inputs(self.clock)
+        self.rot_btn = Pin(self.inputs.btn_value)
+        self.rot_a = Pin(self.inputs.a_value)
+        self.rot_b = Pin(self.inputs.b_value)
+        self.pixels = Pixels(self)
+        self.buzzer = Buzzer(self)
+        self.nvm = NVM(path=nvm)
+
+        if uart == "peer":
+            self.uart = PeerUART(self, self.rng, peer_rate)
+        elif uart:
+            self.uart = SerialUART(uart)
+        else:
+            self.uart = None
+
+    def open_uart(self):
+        return self.uart
+
+    def light_sleep(self, seconds):
+        """Sleep until the timeout or the next button / encoder window"""
+        t = self.clock.t
+        wake = t + seconds
+        for window in self.inputs.btn_windows + self.inputs.enc_windows:
+            if t < window[0] < wake:
+                wake = window[0]
+        self.light_sleeps += 1
+        self.clock.sleep(wake - t)
+
+    def console_key(self):
+        if self.console:
+            return self.console.pop(0)
+        return None
+
+    def log(self, kind, value):
+        if len(self.events) < self.max_events:
+            self.events.append((self.clock.t, kind, value))
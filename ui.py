@@ -0,0 +1,87 @@
+"""Display group and the labels every screen shares
+
+Targets and the dodger belong to the mode modules and are added to `splash`
+when those load.
+"""
+
+import hal
+
+SCREEN_WIDTH = 128
+SCREEN_HEIGHT = 64
+
+CLAW_WIDTH = 40
+CLAW_Y1_BASE = 14
+CLAW_Y2_BASE = 24
+CLAW_Y3_BASE = 36
+
+DROP_STEPS = 10
+DROP_STEP_PIXELS = 3
+
+hw = hal.get()
+Label = hw.Label
+FONT = hw.FONT
+
+# Display group
+splash = hw.Group()
+hw.display.root_group = splash
+
+# UI Labels
+title_label = Label(FONT, text="", color=0xFFFFFF)
+title_label.anchor_point = (0.5, 0.0)
+title_label.anchored_position = (SCREEN_WIDTH // 2, 0)
+splash.append(title_label)
+
+level_label = Label(FONT, text="", color=0xFFFFFF)
+level_label.anchor_point = (0.0, 0.0)
+level_label.anchored_position = (0, 0)
+splash.append(level_label)
+
+timer_label = Label(FONT, text="", color=0xFFFFFF)
+timer_label.anchor_point = (0.0, 0.0)
+timer_label.anchored_position = (0, 10)
+splash.append(timer_label)
+
+hits_label = Label(FONT, text="", color=0xFFFFFF)
+hits_label.anchor_point = (1.0, 0.0)
+hits_label.anchored_position = (SCREEN_WIDTH - 2, 0)
+splash.append(hits_label)
+
+message_label = Label(FONT, text="", color=0xFFFFFF)
+message_label.anchor_point = (0.5, 0.5)
+message_label.anchored_position = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+splash.append(message_label)
+
+# Claw labels
+start_x = (SCREEN_WIDTH - CLAW_WIDTH) // 2
+
+claw_line1 = Label(FONT, text="   ||", color=0xFFFFFF, x=start_x, y=CLAW_Y1_BASE)
+claw_line2 = Label(FONT, text="  ====", color=0xFFFFFF, x=start_x, y=CLAW_Y2_BASE)
+claw_line3 = Label(FONT, text="  |  |", color=0xFFFFFF, x=start_x, y=CLAW_Y3_BASE)
+
+splash.append(claw_line1)
+splash.append(claw_line2)
+splash.append(claw_line3)
+
+claw_line1.hidden = True
+claw_line2.hidden = True
+claw_line3.hidden = True
+
+def set_claw_y(offset):
+    claw_line1.y = CLAW_Y1_BASE + offset
+    claw_line2.y = CLAW_Y2_BASE + offset
+    claw_line3.y = CLAW_Y3_BASE + offset
+
+def set_claw_x(x):
+    claw_line1.x = x
+    claw_line2.x = x
+    claw_line3.x = x
+
+def show_claw(visible):
+    claw_line1.hidden = not visible
+    claw_line2.hidden = not visible
+    claw_line3.hidden = not visible
+
+def clear_hud():
+    level_label.text = ""
+    timer_label.text = ""
+    hits_label.text = ""